@@ -6,23 +6,182 @@ import/export functionality, and migration from JSON.
 """
 
 import sqlite3
+import csv
 import json
 import os
+import queue
+import sys
+import threading
 import pandas as pd
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from pathlib import Path
 
+try:
+    import orjson
+except Exception:
+    orjson = None
+
 _base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 _DB_FILE = os.path.join(_base_dir, "mapping_db.sqlite")
 _JSON_FILE = os.path.join(_base_dir, "mapping_db.json")
 
+_MAPPING_FIELDS = ['ipc_section', 'bns_section', 'ipc_full_text', 'bns_full_text', 'notes', 'source', 'category']
+_MAPPING_COLUMNS = ", ".join(_MAPPING_FIELDS)
+
+# SQL is kept in module-level constants so hot paths reuse the exact same
+# text and hit sqlite3's per-connection statement cache.
+_SQL_INSERT = f"INSERT INTO mappings ({_MAPPING_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)"
+_SQL_INSERT_OR_IGNORE = f"INSERT OR IGNORE INTO mappings ({_MAPPING_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)"
+_SQL_UPSERT_ROW = f"""
+    INSERT INTO mappings ({_MAPPING_COLUMNS})
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(ipc_section) DO UPDATE SET
+        bns_section = excluded.bns_section,
+        ipc_full_text = excluded.ipc_full_text,
+        bns_full_text = excluded.bns_full_text,
+        notes = excluded.notes,
+        source = excluded.source,
+        category = excluded.category
+"""
+_SQL_UPSERT = f"{_SQL_UPSERT_ROW} RETURNING {_MAPPING_COLUMNS}"
+_SQL_GET = f"SELECT {_MAPPING_COLUMNS} FROM mappings WHERE ipc_section = ?"
+_SQL_GET_ALL = f"SELECT {_MAPPING_COLUMNS} FROM mappings"
+_SQL_GET_BY_CATEGORY = f"SELECT {_MAPPING_COLUMNS} FROM mappings WHERE category = ?"
+_SQL_METADATA_REPLACE = "INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)"
+_SQL_SEARCH = f"""
+    SELECT {', '.join('m.' + field for field in _MAPPING_FIELDS)}
+    FROM mappings_fts
+    JOIN mappings m ON m.rowid = mappings_fts.rowid
+    WHERE mappings_fts MATCH ?
+    ORDER BY mappings_fts.rank
+    LIMIT ?
+"""
+
+# External-content FTS5 index over the legal text. The triggers keep it in
+# step with every insert, update and delete on mappings.
+_SQL_CREATE_FTS = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS mappings_fts USING fts5(
+        ipc_section UNINDEXED,
+        ipc_full_text,
+        bns_full_text,
+        content='mappings',
+        content_rowid='rowid',
+        tokenize='porter unicode61'
+    );
+    CREATE TRIGGER IF NOT EXISTS mappings_fts_ai AFTER INSERT ON mappings BEGIN
+        INSERT INTO mappings_fts (rowid, ipc_section, ipc_full_text, bns_full_text)
+        VALUES (new.rowid, new.ipc_section, new.ipc_full_text, new.bns_full_text);
+    END;
+    CREATE TRIGGER IF NOT EXISTS mappings_fts_ad AFTER DELETE ON mappings BEGIN
+        INSERT INTO mappings_fts (mappings_fts, rowid, ipc_section, ipc_full_text, bns_full_text)
+        VALUES ('delete', old.rowid, old.ipc_section, old.ipc_full_text, old.bns_full_text);
+    END;
+    CREATE TRIGGER IF NOT EXISTS mappings_fts_au AFTER UPDATE ON mappings BEGIN
+        INSERT INTO mappings_fts (mappings_fts, rowid, ipc_section, ipc_full_text, bns_full_text)
+        VALUES ('delete', old.rowid, old.ipc_section, old.ipc_full_text, old.bns_full_text);
+        INSERT INTO mappings_fts (rowid, ipc_section, ipc_full_text, bns_full_text)
+        VALUES (new.rowid, new.ipc_section, new.ipc_full_text, new.bns_full_text);
+    END;
+"""
+
+def _json_dumps(value) -> str:
+    """Serialize to a JSON string, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(value).decode("utf-8")
+    return json.dumps(value, ensure_ascii=False)
+
+def _json_loads(value):
+    """Parse a JSON string or bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(value)
+    return json.loads(value)
+
+# Path of the database that has been initialized in this process. Keyed on
+# the path rather than a plain flag so pointing _DB_FILE elsewhere (tests,
+# tooling) initializes the new file on first use.
+_initialized_db: Optional[str] = None
+_init_lock = threading.Lock()
+
+# Read pages through mmap() instead of pread() so lookups and exports skip
+# the kernel-to-user copy. Only on 64-bit hosts, where the address space
+# comfortably fits the mapping, and only for files that fit the window.
+_MMAP_SIZE = 1 << 30 if sys.maxsize > 2**32 else 0
+# With mmap serving reads, cap SQLite's private page cache at 64 MiB (negative = KiB)
+_MMAP_CACHE_SIZE = -65536
+
+def _fits_mmap_window(path: str) -> bool:
+    """Whether the database file at path is small enough to be mapped whole."""
+    if not _MMAP_SIZE or path.startswith("file:"):
+        # URIs here are shared in-memory databases, which have no file to map
+        return False
+    try:
+        return os.path.getsize(path) <= _MMAP_SIZE
+    except OSError:
+        return True  # not created yet
+
+# Test runs only (set by tests/conftest.py): keep the journal in memory and
+# never fsync. A crash can corrupt the database, so never enable in production.
+_FAST_SQLITE = os.environ.get("LTA_TEST_FAST_SQLITE") == "1"
+
+def _connect():
+    """Open a raw connection without triggering initialization."""
+    # "file:" URIs allow e.g. shared in-memory databases (file:name?mode=memory&cache=shared)
+    conn = sqlite3.connect(_DB_FILE, uri=_DB_FILE.startswith("file:"))
+    # first, so the journal-mode switch below waits out another connection's lock
+    conn.execute("PRAGMA busy_timeout = 3000")
+    if _FAST_SQLITE:
+        conn.execute("PRAGMA journal_mode = MEMORY")
+        conn.execute("PRAGMA synchronous = OFF")
+    else:
+        # WAL lets readers run alongside the writer; NORMAL only syncs at checkpoints
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+    if _fits_mmap_window(_DB_FILE):
+        conn.execute(f"PRAGMA mmap_size = {_MMAP_SIZE}")
+        conn.execute(f"PRAGMA cache_size = {_MMAP_CACHE_SIZE}")
+    return conn
+
+def _ensure_initialized():
+    """Create tables and run the JSON migration once per database file."""
+    global _initialized_db
+    if _initialized_db == _DB_FILE:
+        return
+    with _init_lock:
+        if _initialized_db != _DB_FILE:
+            initialize_db()
+            migrate_from_json()
+            _initialized_db = _DB_FILE
+
 def get_db_connection():
-    """Get a database connection."""
-    return sqlite3.connect(_DB_FILE)
+    """Get a database connection, initializing the database on first use."""
+    _ensure_initialized()
+    return _connect()
+
+# Module helpers reuse one connection per thread and database file instead
+# of paying connect + PRAGMA setup on every call. Keyed by path so pointing
+# _DB_FILE elsewhere gets its own connection.
+_local = threading.local()
+
+def _held_connection() -> sqlite3.Connection:
+    """Return the calling thread's long-lived connection to _DB_FILE."""
+    _ensure_initialized()
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(_DB_FILE)
+    if conn is None:
+        conn = conns[_DB_FILE] = _connect()
+    return conn
+
+def close_db_connections() -> None:
+    """Close the connections held by the calling thread."""
+    for conn in getattr(_local, "conns", {}).values():
+        conn.close()
+    _local.conns = {}
 
 def initialize_db():
     """Initialize the database and create tables if they don't exist."""
-    conn = get_db_connection()
+    conn = _connect()
     cursor = conn.cursor()
 
     # Create mappings table with full text
@@ -45,8 +204,22 @@ def initialize_db():
             value TEXT
         )
     ''')
-
     conn.commit()
+
+    # Create the full-text index; a database created before it existed is
+    # back-filled once from the mappings table.
+    try:
+        fts_exists = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'mappings_fts'"
+        ).fetchone()
+        cursor.executescript(_SQL_CREATE_FTS)
+        if not fts_exists:
+            cursor.execute("INSERT INTO mappings_fts (mappings_fts) VALUES ('rebuild')")
+        conn.commit()
+    except sqlite3.OperationalError as e:
+        # SQLite built without FTS5: search_mappings() is unavailable.
+        print(f"Full-text search disabled: {e}")
+
     conn.close()
 
 def migrate_from_json():
@@ -61,26 +234,21 @@ def migrate_from_json():
     initialize_db()
 
     try:
-        with open(_JSON_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        with open(_JSON_FILE, 'rb') as f:
+            data = _json_loads(f.read())
 
-        conn = get_db_connection()
+        conn = _connect()
         cursor = conn.cursor()
 
-        # Insert metadata
+        # Insert metadata and mappings as one batch each
         metadata = data.pop('_metadata', {})
-        for key, value in metadata.items():
-            cursor.execute(
-                "INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)",
-                (key, json.dumps(value))
-            )
+        cursor.executemany(
+            _SQL_METADATA_REPLACE,
+            ((key, _json_dumps(value)) for key, value in metadata.items())
+        )
 
-        # Insert mappings
-        for ipc_section, mapping in data.items():
-            cursor.execute('''
-                INSERT INTO mappings (ipc_section, bns_section, ipc_full_text, bns_full_text, notes, source, category)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
+        cursor.executemany(_SQL_INSERT, (
+            (
                 ipc_section,
                 mapping.get('bns_section', ''),
                 mapping.get('ipc_full_text', ''),
@@ -88,7 +256,9 @@ def migrate_from_json():
                 mapping.get('notes', ''),
                 mapping.get('source', ''),
                 mapping.get('category', '')
-            ))
+            )
+            for ipc_section, mapping in data.items()
+        ))
 
         conn.commit()
         conn.close()
@@ -102,16 +272,10 @@ def insert_mapping(ipc_section: str, bns_section: str,
                    notes: str = "", source: str = "user", category: str = "User Added") -> bool:
     """Insert a single mapping into the database."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            INSERT INTO mappings (ipc_section, bns_section, ipc_full_text, bns_full_text, notes, source, category)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (ipc_section, bns_section, ipc_full_text, bns_full_text, notes, source, category))
-
-        conn.commit()
-        conn.close()
+        conn = _held_connection()
+        # commits on success, rolls back on error, leaves the connection open
+        with conn:
+            conn.execute(_SQL_INSERT, (ipc_section, bns_section, ipc_full_text, bns_full_text, notes, source, category))
         return True
 
     except sqlite3.IntegrityError:
@@ -121,15 +285,87 @@ def insert_mapping(ipc_section: str, bns_section: str,
         print(f"Error inserting mapping: {e}")
         return False
 
+def bulk_insert_mappings(rows: Iterable[Tuple]) -> int:
+    """
+    Insert many mapping rows in one transaction, skipping sections that already exist.
+
+    Each row is (ipc_section, bns_section, ipc_full_text, bns_full_text, notes, source, category).
+    Returns the number of rows inserted, or -1 on error.
+    """
+    try:
+        return _executemany_in_transaction(_SQL_INSERT_OR_IGNORE, rows)
+    except Exception as e:
+        print(f"Error inserting mappings: {e}")
+        return -1
+
+def bulk_upsert_mappings(rows: Iterable[Tuple]) -> int:
+    """
+    Insert or update many mapping rows in one transaction.
+
+    Rows have the same shape as for bulk_insert_mappings(). Returns the number
+    of rows written, or -1 on error (nothing is written then).
+    """
+    try:
+        return _executemany_in_transaction(_SQL_UPSERT_ROW, rows)
+    except Exception as e:
+        print(f"Error upserting mappings: {e}")
+        return -1
+
+def _executemany_in_transaction(sql: str, rows: Iterable[Tuple]) -> int:
+    """Run sql once per row on the held connection with a single commit; rolls back on error."""
+    conn = _held_connection()
+    try:
+        conn.execute("BEGIN")
+        changed = conn.executemany(sql, rows).rowcount
+        conn.commit()
+        return changed
+    except Exception:
+        conn.rollback()
+        raise
+
+def _upsert_returning(cursor: sqlite3.Cursor, row: Tuple) -> Optional[Dict]:
+    """Insert or update one mapping row in a single statement and return the stored row."""
+    cursor.execute(_SQL_UPSERT, row)
+    returned = cursor.fetchone()
+    if returned is None:
+        return None
+    return {
+        'ipc_section': returned[0],
+        'bns_section': returned[1],
+        'ipc_full_text': returned[2],
+        'bns_full_text': returned[3],
+        'notes': returned[4],
+        'source': returned[5],
+        'category': returned[6]
+    }
+
+def upsert_mapping(ipc_section: str, bns_section: str,
+                   ipc_full_text: str = "", bns_full_text: str = "",
+                   notes: str = "", source: str = "user", category: str = "User Added",
+                   conn: Optional[sqlite3.Connection] = None) -> Optional[Dict]:
+    """
+    Insert a mapping, or update it if the IPC section already exists. Returns the stored mapping.
+
+    With conn given, the statement joins the caller's transaction and the
+    caller commits; otherwise it is committed on the held connection.
+    """
+    row = (ipc_section, bns_section, ipc_full_text, bns_full_text, notes, source, category)
+    try:
+        if conn is not None:
+            return _upsert_returning(conn.cursor(), row)
+        conn = _held_connection()
+        with conn:
+            stored = _upsert_returning(conn.cursor(), row)
+        return stored
+
+    except Exception as e:
+        print(f"Error upserting mapping: {e}")
+        return None
+
 def get_mapping(ipc_section: str) -> Optional[Dict]:
     """Get a single mapping by IPC section."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT * FROM mappings WHERE ipc_section = ?", (ipc_section,))
-        row = cursor.fetchone()
-        conn.close()
+        row = _held_connection().execute(_SQL_GET, (ipc_section,)).fetchone()
 
         if row:
             return {
@@ -147,15 +383,41 @@ def get_mapping(ipc_section: str) -> Optional[Dict]:
         print(f"Error getting mapping: {e}")
         return None
 
+def iter_all_mappings(batch_size: int = 500) -> Iterator[Tuple[str, Dict]]:
+    """Yield (ipc_section, mapping) pairs lazily, fetching rows in batches."""
+    cursor = _held_connection().cursor()
+    try:
+        cursor.arraysize = batch_size
+        cursor.execute(_SQL_GET_ALL)
+        while True:
+            rows = cursor.fetchmany()
+            if not rows:
+                break
+            for row in rows:
+                yield row[0], {
+                    'bns_section': row[1],
+                    'ipc_full_text': row[2],
+                    'bns_full_text': row[3],
+                    'notes': row[4],
+                    'source': row[5],
+                    'category': row[6]
+                }
+    finally:
+        cursor.close()
+
 def get_all_mappings() -> Dict[str, Dict]:
     """Get all mappings as a dictionary."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        return dict(iter_all_mappings())
 
-        cursor.execute("SELECT * FROM mappings")
-        rows = cursor.fetchall()
-        conn.close()
+    except Exception as e:
+        print(f"Error getting all mappings: {e}")
+        return {}
+
+def get_mappings_by_category(category: str) -> Dict[str, Dict]:
+    """Get mappings by category."""
+    try:
+        rows = _held_connection().execute(_SQL_GET_BY_CATEGORY, (category,)).fetchall()
 
         mappings = {}
         for row in rows:
@@ -170,18 +432,19 @@ def get_all_mappings() -> Dict[str, Dict]:
         return mappings
 
     except Exception as e:
-        print(f"Error getting all mappings: {e}")
+        print(f"Error getting mappings by category: {e}")
         return {}
 
-def get_mappings_by_category(category: str) -> Dict[str, Dict]:
-    """Get mappings by category."""
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+def _fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query that matches all of its words."""
+    return " ".join('"' + token.replace('"', '""') + '"' for token in text.split())
 
-        cursor.execute("SELECT * FROM mappings WHERE category = ?", (category,))
-        rows = cursor.fetchall()
-        conn.close()
+def search_mappings(query: str, limit: int = 20) -> Dict[str, Dict]:
+    """Full-text search over IPC/BNS legal text, best matches first."""
+    if not query or not query.strip():
+        return {}
+    try:
+        rows = _held_connection().execute(_SQL_SEARCH, (_fts_query(query), limit)).fetchall()
 
         mappings = {}
         for row in rows:
@@ -196,18 +459,13 @@ def get_mappings_by_category(category: str) -> Dict[str, Dict]:
         return mappings
 
     except Exception as e:
-        print(f"Error getting mappings by category: {e}")
+        print(f"Error searching mappings: {e}")
         return {}
 
 def get_categories() -> List[str]:
     """Get all unique categories."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT DISTINCT category FROM mappings")
-        rows = cursor.fetchall()
-        conn.close()
+        rows = _held_connection().execute("SELECT DISTINCT category FROM mappings").fetchall()
 
         return [row[0] for row in rows if row[0]]
 
@@ -218,12 +476,7 @@ def get_categories() -> List[str]:
 def get_mapping_count() -> int:
     """Get total number of mappings."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT COUNT(*) FROM mappings")
-        count = cursor.fetchone()[0]
-        conn.close()
+        count = _held_connection().execute("SELECT COUNT(*) FROM mappings").fetchone()[0]
 
         return count
 
@@ -234,17 +487,12 @@ def get_mapping_count() -> int:
 def get_metadata() -> Dict:
     """Get metadata from database."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT key, value FROM metadata")
-        rows = cursor.fetchall()
-        conn.close()
+        rows = _held_connection().execute("SELECT key, value FROM metadata").fetchall()
 
         metadata = {}
         for key, value in rows:
             try:
-                metadata[key] = json.loads(value)
+                metadata[key] = _json_loads(value)
             except:
                 metadata[key] = value
         return metadata
@@ -254,49 +502,129 @@ def get_metadata() -> Dict:
         return {}
 
 
-def import_mappings_from_csv(file_path: str) -> Tuple[int, List[str]]:
-    """Import mappings from CSV file."""
-    errors = []
-    success_count = 0
+_IMPORT_DEFAULTS = {'source': 'imported', 'category': 'Imported'}
+_IMPORT_CHUNK_SIZE = 10_000
 
-    try:
-        df = pd.read_csv(file_path)
 
-        # Validate required columns
-        required_cols = ['ipc_section', 'bns_section']
-        missing_cols = [col for col in required_cols if col not in df.columns]
-        if missing_cols:
-            errors.append(f"Missing required columns: {', '.join(missing_cols)}")
-            return 0, errors
+def _rows_from_frame(df: pd.DataFrame) -> List[Tuple]:
+    """Normalize whole columns at once and return the rows as plain tuples."""
+    columns = []
+    for col in _MAPPING_FIELDS:
+        if col in df.columns:
+            values = df[col].fillna('').astype(str).str.strip()
+        else:
+            values = pd.Series('', index=df.index)
+        if col in _IMPORT_DEFAULTS:
+            values = values.replace('', _IMPORT_DEFAULTS[col])
+        columns.append(values.to_numpy())
+    return list(zip(*columns))
 
-        conn = get_db_connection()
-        cursor = conn.cursor()
 
-        for _, row in df.iterrows():
-            try:
-                ipc_section = str(row['ipc_section']).strip()
-                bns_section = str(row['bns_section']).strip()
-                # Safe .get() calls for optional text columns
-                ipc_full_text = str(row.get('ipc_full_text', '')).strip()
-                bns_full_text = str(row.get('bns_full_text', '')).strip()
-                notes = str(row.get('notes', '')).strip()
-                source = str(row.get('source', 'imported')).strip()
-                category = str(row.get('category', 'Imported')).strip()
-
-                cursor.execute('''
-                    INSERT OR REPLACE INTO mappings
-                    (ipc_section, bns_section, ipc_full_text, bns_full_text, notes, source, category)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (ipc_section, bns_section, ipc_full_text, bns_full_text, notes, source, category))
-
-                success_count += 1
-
-            except Exception as e:
-                errors.append(f"Error importing row {len(errors) + success_count + 1}: {e}")
+def _missing_import_columns(df: pd.DataFrame) -> List[str]:
+    """Return the required import columns absent from a DataFrame."""
+    required_cols = ['ipc_section', 'bns_section']
+    return [col for col in required_cols if col not in df.columns]
 
+
+class _MissingColumnsError(ValueError):
+    """Raised by the import producer when required columns are absent."""
+
+
+_IMPORT_DONE = object()  # end-of-stream marker on the import queue
+
+
+def _put_until_stopped(out: queue.Queue, item, stop: threading.Event) -> bool:
+    """Put an item on a bounded queue, giving up once the consumer has stopped."""
+    while not stop.is_set():
+        try:
+            out.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _produce_import_rows(read_chunks: Callable[[], Iterable[pd.DataFrame]],
+                         out: queue.Queue, stop: threading.Event) -> None:
+    """Parse and normalize chunks in the background, handing row batches to the writer."""
+    try:
+        for chunk in read_chunks():
+            missing_cols = _missing_import_columns(chunk)
+            if missing_cols:
+                raise _MissingColumnsError(f"Missing required columns: {', '.join(missing_cols)}")
+            if not _put_until_stopped(out, _rows_from_frame(chunk), stop):
+                return
+    except Exception as e:
+        _put_until_stopped(out, e, stop)
+    finally:
+        _put_until_stopped(out, _IMPORT_DONE, stop)
+
+
+def _write_import_chunks(read_chunks: Callable[[], Iterable[pd.DataFrame]], errors: List[str]) -> int:
+    """
+    Import DataFrame chunks with parsing and writing overlapped.
+
+    A producer thread reads and normalizes chunks while this thread writes
+    the previous batch, so an import takes roughly max(parse, insert)
+    rather than their sum. All batches are written inside one enclosing
+    transaction: either every chunk is committed or none is.
+    """
+    batches: queue.Queue = queue.Queue(maxsize=4)
+    stop = threading.Event()
+    producer = threading.Thread(
+        target=_produce_import_rows, args=(read_chunks, batches, stop),
+        name="mapping-import-reader", daemon=True
+    )
+
+    success_count = 0
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN")
+        producer.start()
+        while True:
+            rows = batches.get()
+            if rows is _IMPORT_DONE:
+                break
+            if isinstance(rows, Exception):
+                raise rows
+            cursor.executemany(_SQL_UPSERT_ROW, rows)
+            success_count += len(rows)
         conn.commit()
+    except _MissingColumnsError as e:
+        conn.rollback()
+        errors.append(str(e))
+        return 0
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        stop.set()
         conn.close()
 
+    return success_count
+
+
+def _frame_slices(df: pd.DataFrame, size: int) -> Iterator[pd.DataFrame]:
+    """Yield consecutive row slices of a DataFrame."""
+    if df.empty:
+        yield df
+        return
+    for start in range(0, len(df), size):
+        yield df.iloc[start:start + size]
+
+
+def import_mappings_from_csv(file_path: str) -> Tuple[int, List[str]]:
+    """Import mappings from CSV file, reading it in chunks to bound memory use."""
+    errors = []
+    success_count = 0
+
+    try:
+        success_count = _write_import_chunks(
+            lambda: pd.read_csv(file_path, chunksize=_IMPORT_CHUNK_SIZE, dtype=str, keep_default_na=False),
+            errors
+        )
+
     except Exception as e:
         errors.append(f"Error reading CSV file: {e}")
 
@@ -309,42 +637,10 @@ def import_mappings_from_excel(file_path: str) -> Tuple[int, List[str]]:
     success_count = 0
 
     try:
-        df = pd.read_excel(file_path)
-
-        # Validate required columns
-        required_cols = ['ipc_section', 'bns_section']
-        missing_cols = [col for col in required_cols if col not in df.columns]
-        if missing_cols:
-            errors.append(f"Missing required columns: {', '.join(missing_cols)}")
-            return 0, errors
-
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        for _, row in df.iterrows():
-            try:
-                ipc_section = str(row['ipc_section']).strip()
-                bns_section = str(row['bns_section']).strip()
-                # Safe .get() calls for optional text columns
-                ipc_full_text = str(row.get('ipc_full_text', '')).strip()
-                bns_full_text = str(row.get('bns_full_text', '')).strip()
-                notes = str(row.get('notes', '')).strip()
-                source = str(row.get('source', 'imported')).strip()
-                category = str(row.get('category', 'Imported')).strip()
-
-                cursor.execute('''
-                    INSERT OR REPLACE INTO mappings
-                    (ipc_section, bns_section, ipc_full_text, bns_full_text, notes, source, category)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (ipc_section, bns_section, ipc_full_text, bns_full_text, notes, source, category))
-
-                success_count += 1
-
-            except Exception as e:
-                errors.append(f"Error importing row {len(errors) + success_count + 1}: {e}")
-
-        conn.commit()
-        conn.close()
+        success_count = _write_import_chunks(
+            lambda: _frame_slices(pd.read_excel(file_path, sheet_name=0), _IMPORT_CHUNK_SIZE),
+            errors
+        )
 
     except Exception as e:
         errors.append(f"Error reading Excel file: {e}")
@@ -352,17 +648,28 @@ def import_mappings_from_excel(file_path: str) -> Tuple[int, List[str]]:
     return success_count, errors
 
 
+def _json_member(key: str, value) -> bytes:
+    """Encode one top-level "key": value member, indented as json.dump(indent=2) would."""
+    if orjson is not None:
+        encoded = orjson.dumps({key: value}, option=orjson.OPT_INDENT_2)
+    else:
+        encoded = json.dumps({key: value}, indent=2, ensure_ascii=False).encode('utf-8')
+    # Drop the enclosing "{\n" and "\n}" of the single-member object.
+    return encoded[2:-2]
+
+
 def export_mappings_to_json(file_path: str) -> bool:
-    """Export all mappings to JSON file."""
+    """Export all mappings to JSON file, writing one mapping at a time."""
     try:
-        mappings = get_all_mappings()
         metadata = get_metadata()
 
-        data = {"_metadata": metadata}
-        data.update(mappings)
-
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        with open(file_path, 'wb') as f:
+            f.write(b'{\n')
+            f.write(_json_member('_metadata', metadata))
+            for ipc_section, mapping in iter_all_mappings():
+                f.write(b',\n')
+                f.write(_json_member(ipc_section, mapping))
+            f.write(b'\n}')
 
         return True
 
@@ -372,24 +679,17 @@ def export_mappings_to_json(file_path: str) -> bool:
 
 
 def export_mappings_to_csv(file_path: str) -> bool:
-    """Export all mappings to CSV file."""
+    """Export all mappings to CSV file, streaming rows from the cursor."""
     try:
-        mappings = get_all_mappings()
-
-        data = []
-        for ipc_section, mapping in mappings.items():
-            data.append({
-                'ipc_section': ipc_section,
-                'bns_section': mapping['bns_section'],
-                'ipc_full_text': mapping.get('ipc_full_text', ''),
-                'bns_full_text': mapping.get('bns_full_text', ''),
-                'notes': mapping['notes'],
-                'source': mapping['source'],
-                'category': mapping['category']
-            })
-
-        df = pd.DataFrame(data)
-        df.to_csv(file_path, index=False)
+        cursor = _held_connection().execute(_SQL_GET_ALL)
+        try:
+            with open(file_path, 'w', newline='', encoding='utf-8') as f:
+                # "\n" like the pandas to_csv this replaced, not csv's default "\r\n"
+                writer = csv.writer(f, lineterminator="\n")
+                writer.writerow(_MAPPING_FIELDS)
+                writer.writerows(cursor)
+        finally:
+            cursor.close()
 
         return True
 
@@ -397,6 +697,33 @@ def export_mappings_to_csv(file_path: str) -> bool:
         print(f"Error exporting to CSV: {e}")
         return False
 
-# Initialize database on import
-initialize_db()
-migrate_from_json()
\ No newline at end of file
+
+def backup_database(backup_path: str, compact: bool = False) -> bool:
+    """
+    Back up the database using SQLite's online backup API.
+
+    The WAL (if any) is checkpointed first so the copy includes every
+    committed transaction. With compact=True the backup is written with
+    VACUUM INTO instead, which also defragments the copy; the target must
+    not exist yet in that case.
+    """
+    try:
+        src = get_db_connection()
+        try:
+            src.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            if compact:
+                src.execute("VACUUM INTO ?", (backup_path,))
+            else:
+                dst = sqlite3.connect(backup_path)
+                try:
+                    src.backup(dst, pages=1000)
+                finally:
+                    dst.close()
+        finally:
+            src.close()
+
+        return True
+
+    except Exception as e:
+        print(f"Error backing up database: {e}")
+        return False
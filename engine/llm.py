@@ -4,51 +4,93 @@ Local LLM adapter (optional).
 - If not configured, falls back to a lightweight extractive summary (first N sentences).
 """
 import os
+import re
 import json
 from typing import Optional
 
 OLLAMA_URL: Optional[str] = os.environ.get("LTA_OLLAMA_URL")  # e.g., http://localhost:11434
 OLLAMA_MODEL: str = os.environ.get("LTA_OLLAMA_MODEL", "llama2")
 
+_SESSION = None  # shared requests.Session, created on first Ollama call
+
+def _get_session():
+    """Return a keep-alive HTTP session so repeated calls reuse the TCP connection."""
+    global _SESSION
+    if _SESSION is None:
+        import requests  # local import to keep dependency optional
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update({"Connection": "keep-alive"})
+        _SESSION = session
+    return _SESSION
+
+# A sentence is the text between periods. A '.' directly followed by another
+# non-space character does not split, so decimals ("3.5") and dotted
+# abbreviations ("u.s") stay inside their sentence.
+_SENTENCE_RE = re.compile(r"(?:[^.]|\.(?=[^\s.]))+")
+
 def _extractive_summary(text: str, max_sentences: int = 3) -> str:
-    # naive sentence split
-    sentences = [s.strip() for s in text.replace("\n", " ").split(".") if s.strip()]
+    # naive sentence split, scanned lazily up to max_sentences
+    sentences = []
+    for match in _SENTENCE_RE.finditer(text):
+        sentence = match.group().replace("\n", " ").strip()
+        if not sentence:
+            continue
+        sentences.append(sentence)
+        if len(sentences) >= max_sentences:
+            break
     if not sentences:
         return ""
-    return ". ".join(sentences[:max_sentences]) + (". " if len(sentences) > 0 else "")
+    return ". ".join(sentences) + ". "
+
+def _collect_ndjson(lines) -> str:
+    """Join the "response" chunks of a newline-delimited JSON stream as they arrive."""
+    combined = []
+    for line in lines:
+        line = line.strip() if line else ""
+        if not line:
+            continue
+        try:
+            obj = json.loads(line)
+        except Exception:
+            continue
+        chunk = obj.get("response") or obj.get("text")
+        if chunk:
+            combined.append(str(chunk))
+        if obj.get("done"):
+            break
+    return "".join(combined).strip()
 
 def summarize(text: str, question: Optional[str] = None) -> str:
     if OLLAMA_URL:
         try:
-            import requests  # local import to keep dependency optional
             payload = {
                 "model": OLLAMA_MODEL,
                 "prompt": f"Summarize the following legal text in plain language:{' Question: '+question if question else ''}\n\n{text}",
                 # Ollama streams newline-delimited JSON by default; disable for simpler parsing.
                 "stream": False,
             }
-            resp = requests.post(f"{OLLAMA_URL}/api/generate", json=payload, timeout=15)
-            if resp.ok:
-                try:
-                    data = resp.json()
-                    # Ollama typically returns {"response": "..."} for /api/generate
-                    return data.get("response") or data.get("text") or str(data)
-                except Exception:
-                    # Fallback: handle NDJSON streaming responses (or unexpected formats)
-                    combined = []
-                    for line in resp.text.splitlines():
-                        line = line.strip()
-                        if not line:
-                            continue
+            with _get_session().post(f"{OLLAMA_URL}/api/generate", json=payload, stream=True, timeout=15) as resp:
+                if resp.ok:
+                    if "ndjson" in resp.headers.get("Content-Type", ""):
+                        # Streaming responses are consumed line by line as they arrive.
+                        combined = _collect_ndjson(resp.iter_lines(decode_unicode=True))
+                        if combined:
+                            return combined
+                    else:
                         try:
-                            obj = json.loads(line)
+                            data = json.loads(resp.content)
+                            # Ollama typically returns {"response": "..."} for /api/generate
+                            return data.get("response") or data.get("text") or str(data)
                         except Exception:
-                            continue
-                        chunk = obj.get("response") or obj.get("text")
-                        if chunk:
-                            combined.append(str(chunk))
-                    if combined:
-                        return "".join(combined).strip()
+                            # Fallback: NDJSON sent without its content type (or unexpected formats)
+                            combined = _collect_ndjson(resp.iter_lines(decode_unicode=True))
+                            if combined:
+                                return combined
         except Exception:
             pass
     # fallback
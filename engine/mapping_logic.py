@@ -17,13 +17,26 @@ The mapping database includes 65+ verified mappings organized by offense categor
 Sources: Ministry of Home Affairs, Official Gazette of India
 """
 import os
+import re
 import json
 from difflib import get_close_matches
-from typing import Optional, List, Dict
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Optional, List, Dict, Mapping, Tuple
 from . import db
 
+try:
+    from rapidfuzz import process as _rf_process, fuzz as _rf_fuzz
+except Exception:
+    _rf_process = None
+    _rf_fuzz = None
+
 _base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-_MAPPING_FILE = os.environ.get("LTA_MAPPING_DB") or os.path.join(_base_dir, "mapping_db.json")
+
+def _mapping_file() -> str:
+    return os.environ.get("LTA_MAPPING_DB") or os.path.join(_base_dir, "mapping_db.json")
+
+_MAPPING_FILE = _mapping_file()
 
 # [UPDATED] Default mappings now include FULL TEXT for the demo
 _default_mappings = {
@@ -55,10 +68,55 @@ _default_mappings = {
 
 _mappings = {}
 _metadata = {}
+_CLEAN_RE = re.compile(r"ipc|section|\bs\b", re.IGNORECASE)  # prefixes stripped from queries
+_NUM_RE = re.compile(r"\d+")
+_FUZZY_MAX_LEN = 256  # section keys are short; longer queries are clipped before fuzzy matching
+_keys_tuple: Optional[Tuple[str, ...]] = None  # cached fuzzy-match candidates, rebuilt lazily
+_numeric_keys: Optional[Dict[str, str]] = None  # digits of a key -> key, rebuilt lazily
+_by_category: Optional[Dict[str, Dict[str, dict]]] = None  # lowercased category -> mappings, rebuilt lazily
+
+def _invalidate_indexes():
+    """Drop the lazily built lookup structures and memoized lookups after _mappings changes."""
+    global _keys_tuple, _numeric_keys, _by_category
+    _keys_tuple = None
+    _numeric_keys = None
+    _by_category = None
+    if "map_ipc_to_bns" in globals():
+        map_ipc_to_bns.cache_clear()
+
+def _mapping_keys() -> Tuple[str, ...]:
+    """Return the mapping keys as a tuple, rebuilding it only after changes."""
+    global _keys_tuple
+    if _keys_tuple is None:
+        _keys_tuple = tuple(_mappings.keys())
+    return _keys_tuple
+
+def _numeric_index() -> Dict[str, str]:
+    """Map the digits of each key to the key; a pure-digit key wins over e.g. '498A'."""
+    global _numeric_keys
+    if _numeric_keys is None:
+        index = {}
+        for k in _mappings:
+            digits = ''.join(ch for ch in k if ch.isdigit())
+            if digits and (digits not in index or k == digits):
+                index[digits] = k
+        _numeric_keys = index
+    return _numeric_keys
+
+def _category_index() -> Dict[str, Dict[str, dict]]:
+    """Bucket mappings by lowercased category."""
+    global _by_category
+    if _by_category is None:
+        buckets: Dict[str, Dict[str, dict]] = {}
+        for k, v in _mappings.items():
+            buckets.setdefault(v.get("category", "").lower(), {})[k] = v
+        _by_category = buckets
+    return _by_category
 
 def _load_mappings():
     """Load mappings from database."""
     global _mappings, _metadata
+    _invalidate_indexes()
     try:
         # Load the SQLite db
         _mappings = db.get_all_mappings()
@@ -68,43 +126,58 @@ def _load_mappings():
             # If DB is empty, use defaults and save to DB
             print("📦 DB is empty. Initializing with default mappings...")
             _mappings = _default_mappings.copy()
-            for ipc_section, mapping in _mappings.items():
-                db.insert_mapping(
+            db.bulk_insert_mappings([
+                (
                     ipc_section,
                     mapping["bns_section"],
                     mapping.get("ipc_full_text", ""), # full text
                     mapping.get("bns_full_text", ""), # Pass text
                     mapping["notes"],
                     mapping["source"],
-                    mapping["category"]
+                    mapping["category"],
                 )
+                for ipc_section, mapping in _mappings.items()
+            ])
     except Exception as e:
         print(f"failed to load DB: {e}")
         _mappings = _default_mappings.copy()
 
 _load_mappings()
 
+def _reload():
+    """Re-read LTA_MAPPING_DB and reload mappings from the database without re-importing the module."""
+    global _MAPPING_FILE
+    _MAPPING_FILE = _mapping_file()
+    _load_mappings()
+
+@lru_cache(maxsize=4096)
 def map_ipc_to_bns(query: str) -> Optional[dict]:
     """
     Try exact match by number, then fuzzy match on keys.
     Returns mapping dict or None.
+
+    Results are memoized per query string until the mappings change.
     """
     if not query:
         return None
-    q = query.strip().lower().replace("ipc", "").replace("section", "").replace("s", "").strip()
+    q = _CLEAN_RE.sub("", query).strip().lower()
     if q in _mappings:
         return _mappings[q]
-    
-    # try to extract numeric token
-    tokens = [t for t in q.split() if any(ch.isdigit() for ch in t)]
-    if tokens:
-        for t in tokens:
-            t = ''.join(ch for ch in t if ch.isdigit())
-            if t in _mappings:
-                return _mappings[t]
-                
+
+    # a bare number has no tokens left to try; go straight to fuzzy matching
+    if not q.isdigit():
+        # try each run of digits in the query, in order
+        numeric = _numeric_index()
+        for t in _NUM_RE.findall(q):
+            if t in numeric:
+                return _mappings[numeric[t]]
+
     # fuzzy match on keys
-    close = get_close_matches(q, _mappings.keys(), n=1, cutoff=0.6)
+    q = q[:_FUZZY_MAX_LEN]
+    if _rf_process is not None:
+        match = _rf_process.extractOne(q, _mapping_keys(), scorer=_rf_fuzz.ratio, score_cutoff=60)
+        return _mappings[match[0]] if match else None
+    close = get_close_matches(q, _mapping_keys(), n=1, cutoff=0.6)
     if close:
         return _mappings[close[0]]
     return None
@@ -132,26 +205,23 @@ def add_mapping(ipc_section: str, bns_section: str,
         success = db.insert_mapping(key, bns_section, ipc_full_text, bns_full_text, notes, source, category)
         if success:
             _mappings[key] = mapping_data
+            _invalidate_indexes()
         return success
     else:
         _mappings[key] = mapping_data
+        _invalidate_indexes()
         return True
 
-def get_all_mappings() -> Dict[str, dict]:
-    return _mappings.copy()
+def get_all_mappings() -> Mapping[str, dict]:
+    """Read-only live view of all mappings (no copy)."""
+    return MappingProxyType(_mappings)
 
-def get_mappings_by_category(category: str) -> Dict[str, dict]:
-    return {
-        k: v for k, v in _mappings.items() 
-        if v.get("category", "").lower() == category.lower()
-    }
+def get_mappings_by_category(category: str) -> Mapping[str, dict]:
+    """Read-only view of the mappings in a category, matched case-insensitively."""
+    return MappingProxyType(_category_index().get(category.lower(), {}))
 
 def get_categories() -> List[str]:
-    categories = set()
-    for mapping in _mappings.values():
-        if isinstance(mapping, dict) and "category" in mapping:
-            categories.add(mapping["category"])
-    return sorted(list(categories))
+    return sorted({m["category"] for m in _mappings.values() if isinstance(m, dict) and "category" in m})
 
 def get_mapping_count() -> int:
     return len(_mappings)
@@ -5,17 +5,23 @@ Functions:
 - available_engines() -> list of strings
 """
 import io
+import functools
 import streamlit as st
 from typing import Any, List
 
+@functools.lru_cache(maxsize=1)
+def _get_reader() -> Any:
+    """Build the EasyOCR reader once per process, with or without Streamlit."""
+    print("Loading OCR Model into Memory...")
+    import easyocr
+    # gpu=False ensures it runs safely on CPU-only machines/containers
+    return easyocr.Reader(["en"], gpu=False)
+
 # Load the cached model
 @st.cache_resource(show_spinner=False)
 def load_easyocr_reader() -> Any:
     """Loads the heavy OCR model into memory only once."""
-    print("Loading OCR Model into Memory...")
-    import easyocr
-    # gpu=False ensures it runs safely on CPU-only machines/containers
-    return easyocr.Reader(["en"], gpu=False) 
+    return _get_reader()
 
 def available_engines() -> List[str]:
     engines = []
@@ -31,15 +37,27 @@ def available_engines() -> List[str]:
         pass
     return engines
 
+_NOT_CONFIGURED = "NOTICE UNDER SECTION 41A CrPC... (OCR not configured). Install easyocr/pytesseract & tesseract binary for production."
+
+def _decode_image(file_bytes: bytes) -> Any:
+    """Decode image bytes into an RGB NumPy array, shared by every OCR backend."""
+    import numpy as np
+    from PIL import Image
+    return np.asarray(Image.open(io.BytesIO(file_bytes)).convert("RGB"))
+
 def extract_text(file_bytes: bytes) -> str:
+    try:
+        img = _decode_image(file_bytes)
+    except Exception as e:
+        print(f"Image decode failed: {e}")
+        return _NOT_CONFIGURED
+
     # Try EasyOCR first
     try:
-        from PIL import Image
         # Get the cached model
         reader = load_easyocr_reader()
-        image = Image.open(io.BytesIO(file_bytes))
-        result = reader.readtext(image)
-        return " ".join([r[1] for r in result])
+        # detail=0 returns plain strings instead of (bbox, text, confidence) tuples
+        return " ".join(reader.readtext(img, detail=0, paragraph=True))
     except Exception as e:
         # 👇 ADD THIS PRINT STATEMENT
         print(f"EasyOCR Failed: {e}") 
@@ -48,8 +66,7 @@ def extract_text(file_bytes: bytes) -> str:
         try:
             import pytesseract
             from PIL import Image
-            image = Image.open(io.BytesIO(file_bytes))
-            return pytesseract.image_to_string(image)
+            return pytesseract.image_to_string(Image.fromarray(img))
         except Exception as e2:
             print(f"Pytesseract Failed: {e2}")
-            return "NOTICE UNDER SECTION 41A CrPC... (OCR not configured). Install easyocr/pytesseract & tesseract binary for production."
\ No newline at end of file
+            return _NOT_CONFIGURED
@@ -0,0 +1,25 @@
+"""
+PDF page text extraction for the RAG index.
+- extract_pages(path) -> [(file name, page number, text), ...] for non-empty pages
+Kept free of Streamlit and model imports so spawned extraction workers start quickly.
+"""
+import os
+
+try:
+    import pdfplumber
+except Exception:
+    pdfplumber = None
+
+
+def extract_pages(path):
+    """Return (file, page, text) for every non-empty page of one PDF; [] if it cannot be read."""
+    out = []
+    try:
+        with pdfplumber.open(path) as pdf:
+            for i, page in enumerate(pdf.pages, start=1):
+                text = (page.extract_text() or "").strip()
+                if text:
+                    out.append((os.path.basename(path), i, text))
+    except Exception:
+        return []
+    return out
@@ -4,24 +4,39 @@ Usage:
 - index_pdfs() to auto-scan ./law_pdfs (create dir and add PDFs)
 - add_pdf(file_path) to add a single PDF
 - search_pdfs(query) -> formatted markdown string or None
+- search_pdfs(query, return_structured=True) -> list of Hit dicts or None
+- set_backend("keyword") to skip embeddings entirely (tests, lexical queries)
 """
 import os
+import re
 import glob
+import heapq
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 import streamlit as st
 import numpy as np
-from collections import Counter
+from collections import Counter, defaultdict
+from typing import List, Optional, TypedDict
 
 try:
     import pdfplumber
 except Exception:
     pdfplumber = None
 
+# extraction lives in its own light module so spawned workers skip Streamlit and model imports
+from engine.pdf_text import extract_pages
+
+_EMB_MODEL_NAME = "all-MiniLM-L6-v2"
+_EMB_CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "vector_store")
+
 # Load the cached model
 @st.cache_resource(show_spinner=False)
 def load_embedding_model():
     """Loads the SentenceTransformer model into memory only once."""
     from sentence_transformers import SentenceTransformer
-    return SentenceTransformer("all-MiniLM-L6-v2")
+    return SentenceTransformer(_EMB_MODEL_NAME)
 
 # Check environment config
 _USE_EMB = os.environ.get("LTA_USE_EMBEDDINGS") == "1"
@@ -43,53 +58,202 @@ try:
 except Exception:
     _EMB_ENGINE_AVAILABLE = False
 
+class Hit(TypedDict):
+    """One search result, as returned by search_pdfs(..., return_structured=True)."""
+    source: str   # PDF file name
+    page: int
+    text: str     # snippet around the match
+    score: float  # keyword count or cosine similarity, depending on the backend
+
 _INDEX = []        # page-level index
 _INDEX_LOADED = False
-_EMB_INDEX = []    # cached embeddings for current docs
+_EMB_MATRIX = None  # (N, D) float32, rows L2-normalized; one row per page chunk
+_EMB_PAGE_STARTS = None  # first matrix row of each page; a page's chunks are contiguous
+# Per-page display metadata, one parallel list per field (row i = page i)
+_EMB_FILES = []
+_EMB_PAGES = []
+_EMB_SNIPPETS = []  # first 300 chars, newlines flattened
+_CHUNK_WORDS = 180  # ~256 word pieces, the encoder's max_seq_length
+_CHUNK_OVERLAP = 30
+_PARALLEL_MIN_FILES = 4  # below this, starting worker processes costs more than it saves
+_PERSIST_EMB_CACHE = True  # False keeps embeddings in memory only: no cache reads or writes (tests)
+_POSTINGS = {}      # token -> [(index into _INDEX, count on that page), ...]
+_BACKEND = "auto"  # "auto": embeddings when configured, else keyword; "keyword": keyword only
+_LAST_FINGERPRINT = None  # what the current index was built from; see _dir_fingerprint
+_TOKEN_RE = re.compile(r"\w+")
 
 def _ensure_dir(path):
     os.makedirs(path, exist_ok=True)
 
+def _emb_cache_path(dir_path):
+    """Cache file for one PDF directory; each save replaces the previous matrix."""
+    h = hashlib.sha256(os.path.abspath(dir_path).encode())
+    return os.path.join(_EMB_CACHE_DIR, f"emb_{h.hexdigest()[:16]}.npz")
+
+def _emb_cache_key(files):
+    """Identifies the exact set of PDFs (path, mtime, size) and model a cached matrix was built from."""
+    h = hashlib.sha256(f"{_EMB_MODEL_NAME}:{_CHUNK_WORDS}:{_CHUNK_OVERLAP}".encode())
+    for f in sorted(files):
+        try:
+            info = os.stat(f)
+        except OSError:  # removed since the glob; extraction skips it too
+            continue
+        h.update(f"{os.path.abspath(f)}\0{info.st_mtime_ns}\0{info.st_size}\n".encode())
+    return h.hexdigest()
+
+def set_backend(name):
+    """Choose the search backend: "auto" (the default) or "keyword" (postings only, no model)."""
+    global _BACKEND
+    if name not in ("auto", "keyword"):
+        raise ValueError(f"Unknown search backend: {name!r}")
+    _BACKEND = name
+
+def _embeddings_on():
+    return _BACKEND == "auto" and _USE_EMB and _EMB_AVAILABLE
+
+def _dir_fingerprint(dir_path, files):
+    """Directory, (name, mtime, size) of each PDF and the settings that shape the index."""
+    stats = []
+    for f in sorted(files):
+        try:
+            info = os.stat(f)
+        except OSError:  # removed since the glob; not part of what gets indexed
+            continue
+        stats.append((os.path.basename(f), info.st_mtime_ns, info.st_size))
+    return (os.path.abspath(dir_path), tuple(stats), _embeddings_on(), _CHUNK_WORDS, _CHUNK_OVERLAP)
+
+def _chunks(text, size=None, overlap=None):
+    """Split text into overlapping windows of whole words, each short enough to encode untruncated."""
+    size = size or _CHUNK_WORDS
+    overlap = _CHUNK_OVERLAP if overlap is None else overlap
+    words = text.split()
+    if len(words) <= size:
+        return [" ".join(words)]
+    step = size - overlap
+    return [" ".join(words[i:i + size]) for i in range(0, len(words) - overlap, step)]
+
+def _load_cached_matrix(path, key, rows):
+    try:
+        with np.load(path) as data:
+            if str(data["key"]) != key:
+                return None
+            q, scales = data["q"], data["scales"]
+    except Exception:
+        return None
+    if q.shape[0] != rows:
+        return None
+    # dequantize once at load; NumPy has no BLAS path for int8, so queries stay float32
+    matrix = q.astype(np.float32) * scales[:, None]
+    # rounding bends row lengths off 1; restore unit rows so scores stay cosines
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return matrix
+
+def _save_cached_matrix(path, key, matrix):
+    # int8 rows with a per-row scale: a quarter of the float32 bytes on disk
+    scales = np.abs(matrix).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    q = np.round(matrix / scales[:, None]).astype(np.int8)
+    # write to a temp file and rename, so a concurrent reader never sees half a file
+    try:
+        _ensure_dir(_EMB_CACHE_DIR)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as fh:
+            np.savez(fh, key=np.array(key), q=q, scales=scales.astype(np.float32))
+        os.replace(tmp, path)
+    except Exception as e:
+        print(f"Embedding cache write failed: {e}")
+
+def _extract_all(files):
+    """Extract pages from every file, across processes when there are enough files."""
+    if len(files) >= _PARALLEL_MIN_FILES:
+        try:
+            # spawn, not fork: forking Streamlit's multi-threaded server can copy held locks
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=min(len(files), os.cpu_count() or 1), mp_context=ctx) as ex:
+                return list(ex.map(extract_pages, files))
+        except Exception as e:
+            print(f"Parallel PDF extraction failed, falling back to sequential: {e}")
+    return [extract_pages(f) for f in files]
+
+def _build_postings(docs):
+    postings = defaultdict(list)
+    for idx, doc in enumerate(docs):
+        for token, count in doc["tok_count"].items():
+            postings[token].append((idx, count))
+    return dict(postings)
+
 def index_pdfs(dir_path="law_pdfs"):
-    global _INDEX_LOADED, _INDEX, _EMB_INDEX
+    global _INDEX_LOADED, _INDEX, _POSTINGS, _EMB_MATRIX, _EMB_PAGE_STARTS, _EMB_FILES, _EMB_PAGES, _EMB_SNIPPETS
+    global _LAST_FINGERPRINT
     _ensure_dir(dir_path)
     if pdfplumber is None:
         return False
         
     # Standard file reading 
     files = glob.glob(os.path.join(dir_path, "*.pdf"))
+    # Same directory, same files, same settings -> the current index is still valid
+    fingerprint = _dir_fingerprint(dir_path, files)
+    if _INDEX_LOADED and fingerprint == _LAST_FINGERPRINT:
+        return True
+    _LAST_FINGERPRINT = fingerprint
     if not files:
         _INDEX_LOADED = True
         _INDEX = []
-        _EMB_INDEX = []
+        _POSTINGS = {}
+        _EMB_MATRIX = None
+        _EMB_PAGE_STARTS = None
+        _EMB_FILES, _EMB_PAGES, _EMB_SNIPPETS = [], [], []
         return True
         
     docs = []
-    for f in files:
-        try:
-            with pdfplumber.open(f) as pdf:
-                for i, page in enumerate(pdf.pages, start=1):
-                    text = (page.extract_text() or "").strip()
-                    if text:
-                        docs.append({"file": os.path.basename(f), "page": i, "text": text})
-        except Exception:
-            continue
+    for rows in _extract_all(files):
+        for file, page, text in rows:
+            text_lower = text.lower()
+            docs.append({
+                "file": file,
+                "page": page,
+                "text": text,
+                # lowercase + token counts once here, so queries are dict lookups
+                "text_lower": text_lower,
+                "tok_count": Counter(_TOKEN_RE.findall(text_lower)),
+            })
     _INDEX = docs
+    _POSTINGS = _build_postings(docs)
     _INDEX_LOADED = True
 
     # Build Embeddings if enabled
-    if _USE_EMB and _EMB_AVAILABLE:
+    if _embeddings_on():
         try:
-            # --- USE CACHED MODEL HERE ---
-            model = load_embedding_model()
-            
-            texts = [d["text"] for d in _INDEX]
-            # Generate embeddings using the cached model
-            vecs = model.encode(texts, convert_to_numpy=True, show_progress_bar=False)
-            
-            _EMB_INDEX = []
-            for d, v in zip(_INDEX, vecs):
-                _EMB_INDEX.append({"file": d["file"], "page": d["page"], "text": d["text"], "vec": v})
+            # Embed overlapping chunks so long pages are not truncated by the encoder
+            chunk_list, starts = [], []
+            for d in _INDEX:
+                starts.append(len(chunk_list))
+                chunk_list.extend(_chunks(d["text"]))
+
+            # Unchanged PDFs -> reuse the matrix saved last time instead of re-encoding
+            cache_path = _emb_cache_path(dir_path) if _PERSIST_EMB_CACHE else None
+            cache_key = _emb_cache_key(files) if cache_path else None
+            matrix = _load_cached_matrix(cache_path, cache_key, len(chunk_list)) if cache_path else None
+            if matrix is None:
+                # --- USE CACHED MODEL HERE ---
+                model = load_embedding_model()
+
+                # Generate embeddings using the cached model
+                vecs = model.encode(chunk_list, batch_size=64, convert_to_numpy=True,
+                                    normalize_embeddings=True, show_progress_bar=False)
+
+                # One contiguous matrix with unit rows: cosine similarity becomes a single matmul
+                matrix = np.asarray(vecs, dtype=np.float32)
+                matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-9
+                if cache_path:
+                    _save_cached_matrix(cache_path, cache_key, matrix)
+            _EMB_MATRIX = matrix
+            _EMB_PAGE_STARTS = np.asarray(starts, dtype=np.intp)
+            _EMB_FILES = [d["file"] for d in _INDEX]
+            _EMB_PAGES = [d["page"] for d in _INDEX]
+            _EMB_SNIPPETS = [d["text"][:300].replace("\n", " ") for d in _INDEX]
         except Exception as e:
             print(f"Embedding generation failed: {e}")
             pass
@@ -101,82 +265,134 @@ def add_pdf(file_path):
     return index_pdfs(os.path.dirname(file_path) or "law_pdfs")
 
 def clear_index():
-    global _INDEX, _INDEX_LOADED, _EMB_INDEX
+    global _INDEX, _INDEX_LOADED, _POSTINGS, _EMB_MATRIX, _EMB_PAGE_STARTS, _EMB_FILES, _EMB_PAGES, _EMB_SNIPPETS
+    global _LAST_FINGERPRINT
+    _LAST_FINGERPRINT = None
     _INDEX = []
+    _POSTINGS = {}
     _INDEX_LOADED = True
-    _EMB_INDEX = []
+    _EMB_MATRIX = None
+    _EMB_PAGE_STARTS = None
+    _EMB_FILES, _EMB_PAGES, _EMB_SNIPPETS = [], [], []
 
-def _emb_search(query: str, top_k: int = 3):
-    if not _EMB_INDEX or not _EMB_AVAILABLE:
+def reset():
+    """Drop the index and mark it not loaded, as right after import; the next search re-indexes."""
+    global _INDEX_LOADED
+    clear_index()
+    _INDEX_LOADED = False
+
+@lru_cache(maxsize=256)
+def _encode_query(model, query: str) -> np.ndarray:
+    """Unit-length query vector, memoized per (model, query); read-only since callers share it."""
+    qvec = np.asarray(model.encode([query], convert_to_numpy=True)[0], dtype=np.float32)
+    qvec = qvec / (np.linalg.norm(qvec) + 1e-9)
+    qvec.flags.writeable = False
+    return qvec
+
+def _emb_hits(query: str, top_k: int = 3) -> Optional[List[Hit]]:
+    if _EMB_MATRIX is None or not _EMB_AVAILABLE:
         return None
     try:
         # --- USE CACHED MODEL HERE ---
         model = load_embedding_model()
         
-        qvec = model.encode([query], convert_to_numpy=True)[0]
-        scores = []
-        for d in _EMB_INDEX:
-            vec = d["vec"]
-            # cosine similarity
-            sim = float(np.dot(qvec, vec) / (np.linalg.norm(qvec) * np.linalg.norm(vec) + 1e-9))
-            scores.append((sim, d["file"], d["page"], d["text"]))
-        scores.sort(key=lambda x: x[0], reverse=True)
-        
-        results = scores[:top_k]
-        md = ["> **Answer (embedding search, grounded):**\n"]
-        for sim, file, page, text in results:
-            snippet = text[:300].replace("\n", " ")
-            md.append(f"> - **Source:** {file} | **Page:** {page} | **Score:** {sim:.3f}\n>   > _{snippet}_\n")
-        return "\n".join(md)
+        qvec = _encode_query(model, query)
+        # cosine similarity against every chunk in one BLAS call, then each page's best chunk
+        sims = np.maximum.reduceat(_EMB_MATRIX @ qvec, _EMB_PAGE_STARTS)
+
+        k = min(top_k, sims.shape[0])
+        if k <= 0:
+            return None
+        # select the top k without sorting all N scores, then order only those
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top])]
+
+        return [
+            Hit(source=_EMB_FILES[i], page=_EMB_PAGES[i], text=_EMB_SNIPPETS[i], score=float(sims[i]))
+            for i in top
+        ]
     except Exception:
         return None
 
-def search_pdfs(query: str, top_k: int = 3):
+def _emb_search(query: str, top_k: int = 3):
+    hits = _emb_hits(query, top_k=top_k)
+    if not hits:
+        return None
+    md = ["> **Answer (embedding search, grounded):**\n"]
+    for h in hits:
+        md.append(f"> - **Source:** {h['source']} | **Page:** {h['page']} | **Score:** {h['score']:.3f}\n>   > _{h['text']}_\n")
+    return "\n".join(md)
+
+def search_pdfs(query: str, top_k: int = 3, return_structured: bool = False):
     """
     Default: if an embeddings engine is configured -> use it.
     Else if internal embeddings available -> use that.
     Else -> keyword page-count search.
+    After set_backend("keyword") only the keyword search runs.
+
+    With return_structured=True the hits come back as a list of Hit dicts
+    (at most top_k) and no markdown is built.
     """
     if not query or not query.strip():
         return None
 
     # (Keep your existing external engine logic here)
-    if os.environ.get("LTA_USE_EMBEDDINGS") == "1" and _EMB_ENGINE_AVAILABLE:
+    if _BACKEND == "auto" and os.environ.get("LTA_USE_EMBEDDINGS") == "1" and _EMB_ENGINE_AVAILABLE:
         try:
             emb_res = _emb_search_index(query, top_k=top_k)
             if emb_res:
+                if return_structured:
+                    return [Hit(source=f, page=p, text=t, score=float(sc)) for sc, f, p, t in emb_res]
                 return emb_res
             
         except Exception as e:print(f"External Embeddings Engine Failed: {e}")
 
     # Internal embeddings fallback
-    if _USE_EMB and _EMB_AVAILABLE:
-        emb_res = _emb_search(query, top_k=top_k)
-        if emb_res:
-            return emb_res
+    if _embeddings_on():
+        if return_structured:
+            hits = _emb_hits(query, top_k=top_k)
+            if hits:
+                return hits
+        else:
+            emb_res = _emb_search(query, top_k=top_k)
+            if emb_res:
+                return emb_res
 
     # (Keep your token-count fallback here)
     if not _INDEX_LOADED:
         index_pdfs()
     if not _INDEX:
         return None
-    q = query.lower().strip()
-    tokens = [t for t in q.split() if t]
-    if not tokens:
-        return None
-    scored = []
-    for doc in _INDEX:
-        txt = doc["text"].lower()
-        score = sum(txt.count(t) for t in tokens)
-        if score > 0:
-            first_pos = min((txt.find(t) for t in tokens if txt.find(t) >= 0), default=-1)
-            snippet = doc["text"][first_pos:first_pos+300].replace("\n"," ") if first_pos >= 0 else doc["text"][:200]
-            scored.append((score, doc["file"], doc["page"], snippet))
-    if not scored:
+    # normalized once; everything below works on q and its tokens
+    q = query.lower()
+    # repeated query words weigh in once per repeat, but walk their postings only once
+    query_counts = Counter(_TOKEN_RE.findall(q))
+    if _POSTINGS.keys().isdisjoint(query_counts):
         return None
-    scored.sort(key=lambda x: x[0], reverse=True)
-    results = scored[:top_k]
+    tokens = [t for t in query_counts if t in _POSTINGS]
+    # only pages that contain a query token are touched
+    scores = defaultdict(int)
+    for t in tokens:
+        weight = query_counts[t]
+        for idx, cnt in _POSTINGS[t]:
+            scores[idx] += cnt * weight
+    # highest count first; ties keep index order
+    top = heapq.nlargest(top_k, scores.items(), key=lambda kv: (kv[1], -kv[0]))
+    # one alternation finds the earliest hit of any token in a single pass
+    anchor = re.compile("|".join(re.escape(t) for t in tokens))
+    results = []
+    for idx, score in top:
+        doc = _INDEX[idx]
+        m = anchor.search(doc["text_lower"])
+        if m:
+            start = max(0, m.start() - 20)
+            snippet = doc["text"][start:start+300].replace("\n"," ")
+        else:
+            snippet = doc["text"][:200]
+        results.append(Hit(source=doc["file"], page=doc["page"], text=snippet.strip(), score=float(score)))
+    if return_structured:
+        return results
     md_lines = ["> **Answer (grounded snippets):**\n"]
-    for score, file, page, snippet in results:
-        md_lines.append(f"> - **Source:** {file} | **Page:** {page}\n>   > _{snippet.strip()}_\n")
+    for h in results:
+        md_lines.append(f"> - **Source:** {h['source']} | **Page:** {h['page']}\n>   > _{h['text']}_\n")
     return "\n".join(md_lines)
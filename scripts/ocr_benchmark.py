@@ -0,0 +1,165 @@
+"""
+OCR benchmark: run extract_text() over a folder of images and report the
+character error rate (CER) against ground-truth transcripts.
+
+Each image (.png/.jpg/.jpeg) is paired with a .txt file of the same name
+holding the expected text.
+
+Usage:
+    python scripts/ocr_benchmark.py --dir samples/ocr
+"""
+import argparse
+import glob
+from concurrent.futures import ProcessPoolExecutor
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+sys.path.append('.')
+
+try:
+    from rapidfuzz.distance import Levenshtein as _Lev
+except Exception:
+    _Lev = None
+
+_IMAGE_EXTS = (".png", ".jpg", ".jpeg")
+
+
+def levenshtein(a: str, b: str, max_dist: Optional[int] = None) -> int:
+    """
+    Edit distance between two strings (insertions, deletions, substitutions).
+
+    With max_dist set, any distance above it is reported as max_dist + 1,
+    which lets the computation stop early.
+    """
+    if _Lev is not None:
+        return _Lev.distance(a, b, score_cutoff=max_dist)
+    return _levenshtein_rows(a, b, max_dist)
+
+
+def _codepoints(s: str) -> np.ndarray:
+    return np.frombuffer(s.encode("utf-32-le"), dtype=np.uint32)
+
+
+def _levenshtein_rows(a: str, b: str, max_dist: Optional[int] = None) -> int:
+    """
+    NumPy fallback for levenshtein(): one vectorized pass per row of the DP table.
+
+    The substitution/deletion candidates of a row depend only on the previous
+    row. The insertion chain curr[j] = min(curr[j], curr[j-1] + 1) is a running
+    minimum of (t[k] - k) shifted back by j, so a row needs no Python inner loop.
+    """
+    la, lb = len(a), len(b)
+    if la < lb:
+        a, b = b, a
+        la, lb = lb, la
+    if max_dist is not None and la - lb > max_dist:
+        return max_dist + 1
+    if lb == 0:
+        return la
+    b_codes = _codepoints(b)
+    offsets = np.arange(lb + 1, dtype=np.int32)
+    prev = offsets.copy()
+    curr = np.empty_like(prev)
+    for i, code in enumerate(_codepoints(a).tolist(), start=1):
+        curr[0] = i
+        np.minimum(prev[1:] + 1, prev[:-1] + (b_codes != code), out=curr[1:])
+        curr -= offsets
+        np.minimum.accumulate(curr, out=curr)
+        curr += offsets
+        if max_dist is not None and curr.min() > max_dist:
+            return max_dist + 1
+        prev, curr = curr, prev
+    dist = int(prev[-1])
+    if max_dist is not None and dist > max_dist:
+        return max_dist + 1
+    return dist
+
+
+def cer(reference: str, hypothesis: str) -> float:
+    """Character error rate: edit distance normalized by the reference length."""
+    if not reference:
+        return 0.0 if not hypothesis else 1.0
+    return levenshtein(reference, hypothesis) / len(reference)
+
+
+def find_samples(dir_path: str) -> List[Tuple[str, str]]:
+    """Return (image, transcript) path pairs for every image that has a transcript."""
+    samples = []
+    for image_path in sorted(glob.glob(os.path.join(dir_path, "*"))):
+        if not image_path.lower().endswith(_IMAGE_EXTS):
+            continue
+        text_path = os.path.splitext(image_path)[0] + ".txt"
+        if os.path.exists(text_path):
+            samples.append((image_path, text_path))
+    return samples
+
+
+def _warm_reader() -> None:
+    """Pool initializer: load the OCR model once per worker, before the first image."""
+    try:
+        from engine.ocr_processor import load_easyocr_reader
+        load_easyocr_reader()
+    except Exception:
+        pass
+
+
+def _process(sample: Tuple[str, str]) -> Dict:
+    """OCR one image and score it against its transcript."""
+    from engine.ocr_processor import extract_text
+
+    image_path, text_path = sample
+    with open(text_path, "r", encoding="utf-8") as f:
+        reference = f.read().strip()
+    with open(image_path, "rb") as f:
+        image_bytes = f.read()
+    start = time.perf_counter()
+    hypothesis = extract_text(image_bytes).strip()
+    elapsed = time.perf_counter() - start
+    return {
+        "file": os.path.basename(image_path),
+        "cer": round(cer(reference, hypothesis), 4),
+        "seconds": round(elapsed, 3),
+    }
+
+
+def run_benchmark(dir_path: str, workers: int = None) -> List[Dict]:
+    """
+    OCR every sample in dir_path and score it against its transcript.
+
+    Samples are spread over a process pool (default: one worker per CPU);
+    workers=1 runs them in this process. Results keep the sample order.
+    """
+    samples = find_samples(dir_path)
+    workers = min(workers or os.cpu_count() or 1, len(samples))
+    if workers <= 1:
+        return [_process(sample) for sample in samples]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_warm_reader) as ex:
+        return list(ex.map(_process, samples))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark OCR accuracy against ground-truth transcripts")
+    parser.add_argument("--dir", required=True, help="folder of images with matching .txt transcripts")
+    parser.add_argument("--workers", type=int, default=None, help="OCR processes to run (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.dir, workers=args.workers)
+    if not results:
+        print("No image/transcript pairs found")
+        return 1
+    summary = {
+        "files": len(results),
+        "mean_cer": round(sum(r["cer"] for r in results) / len(results), 4),
+        "results": results,
+    }
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
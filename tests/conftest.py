@@ -1,11 +1,39 @@
 from __future__ import annotations
 
+import copy
+import functools
+import importlib
+import os
+import shutil
 import sys
+import tempfile
 from pathlib import Path
 from unittest.mock import MagicMock
 
+import pytest
+
+_WORKER_DB_DIR: str | None = None
+
+
+def _cache_resource(func=None, **kwargs):
+    """Stand-in for st.cache_resource that memoizes like Streamlit does.
+
+    Cached loaders (embedding model, OCR reader) then build their resource once
+    per session instead of on every call. ``.clear()`` mirrors Streamlit's API.
+    """
+    def decorate(fn):
+        cached = functools.lru_cache(maxsize=None)(fn)
+        cached.clear = cached.cache_clear
+        return cached
+    return decorate(func) if callable(func) else decorate
+
+
+def pytest_configure(config) -> None:
+    # Registered here too so the marks are known when pytest-xdist is not installed
+    config.addinivalue_line(
+        "markers", "xdist_group(name): keep these tests on one pytest-xdist worker (--dist loadgroup)"
+    )
 
-def pytest_configure() -> None:
     project_root = Path(__file__).resolve().parents[1]
     root_str = str(project_root)
     if root_str not in sys.path:
@@ -14,7 +42,180 @@ def pytest_configure() -> None:
     # Mock streamlit before any engine imports to avoid cache_resource issues in tests
     if "streamlit" not in sys.modules:
         mock_st = MagicMock()
-        # Make cache_resource a pass-through decorator
-        mock_st.cache_resource = lambda *args, **kwargs: (lambda fn: fn)
+        mock_st.cache_resource = _cache_resource
         sys.modules["streamlit"] = mock_st
 
+    # Give this process (each pytest-xdist worker) its own copy of the database
+    # before any test module imports engine.mapping_logic and loads from it, so
+    # tests never write to the tracked file or race another worker for it.
+    global _WORKER_DB_DIR
+    # Skip fsync and the on-disk journal for the throwaway test databases
+    os.environ.setdefault("LTA_TEST_FAST_SQLITE", "1")
+    db = importlib.import_module("engine.db")
+    _WORKER_DB_DIR = tempfile.mkdtemp(prefix="lta_db_")
+    path = os.path.join(_WORKER_DB_DIR, "mapping_db.sqlite")
+    if os.path.exists(db._DB_FILE):
+        shutil.copyfile(db._DB_FILE, path)
+    db._DB_FILE = path
+
+
+def pytest_unconfigure() -> None:
+    if _WORKER_DB_DIR is not None:
+        importlib.import_module("engine.db").close_db_connections()
+        shutil.rmtree(_WORKER_DB_DIR, ignore_errors=True)
+
+
+def pytest_collection_modifyitems(items) -> None:
+    # mapping_module reloads engine.mapping_logic with LTA_MAPPING_DB pointed
+    # at a temp file; keep those tests together under --dist loadgroup.
+    for item in items:
+        if "mapping_module" in getattr(item, "fixturenames", ()):
+            item.add_marker(pytest.mark.xdist_group(name="env_mutating"))
+
+
+# ============================================================================
+# Shared module fixtures
+# ============================================================================
+# Engine modules are imported once per session. Instead of deleting them from
+# sys.modules and re-executing them for every test, the function-scoped
+# fixtures put their module-level state back to the values captured at import
+# (rag_engine has its own reset()). rag_engine tests run on its keyword
+# backend; tests of the embedding path switch it back to "auto".
+
+_EMBEDDINGS_STATE = ("_USE_EMB", "_EMB_AVAILABLE", "_IDX_DIR", "_IDX_PATH", "_META_PATH", "_MODEL", "_INDEX", "_META")
+_RAG_STATE = (
+    "_USE_EMB", "_EMB_AVAILABLE", "_INDEX", "_INDEX_LOADED", "_POSTINGS",
+    "_EMB_MATRIX", "_EMB_PAGE_STARTS", "_EMB_FILES", "_EMB_PAGES", "_EMB_SNIPPETS",
+    "_EMB_CACHE_DIR", "_PERSIST_EMB_CACHE", "_CHUNK_WORDS", "_CHUNK_OVERLAP", "_PARALLEL_MIN_FILES",
+    "_LAST_FINGERPRINT", "_BACKEND",
+    "load_embedding_model",
+)
+
+
+def _snapshot(module, names):
+    return {name: getattr(module, name) for name in names}
+
+
+def _restore(monkeypatch, module, snapshot):
+    for name, value in snapshot.items():
+        monkeypatch.setattr(module, name, copy.copy(value))
+    return module
+
+
+@pytest.fixture(scope="session")
+def _embeddings_module(tmp_path_factory):
+    module = importlib.import_module("engine.embeddings_engine")
+    # a vector store per session (per xdist worker) instead of the repo's ./vector_store
+    store = tmp_path_factory.mktemp("vector_store")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(module, "_IDX_DIR", str(store))
+        mp.setattr(module, "_IDX_PATH", str(store / "faiss.index"))
+        mp.setattr(module, "_META_PATH", str(store / "meta.txt"))
+        yield module, _snapshot(module, _EMBEDDINGS_STATE)
+
+
+@pytest.fixture
+def embeddings_module(_embeddings_module, monkeypatch):
+    """engine.embeddings_engine with its module-level state reset."""
+    module, snapshot = _embeddings_module
+    return _restore(monkeypatch, module, snapshot)
+
+
+@pytest.fixture(scope="session")
+def _rag_module(tmp_path_factory):
+    module = importlib.import_module("engine.rag_engine")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(module, "_EMB_CACHE_DIR", str(tmp_path_factory.mktemp("emb_cache")))
+        # test corpora are thrown away; tests of the cache itself switch it back on
+        mp.setattr(module, "_PERSIST_EMB_CACHE", False)
+        mp.setattr(module, "_BACKEND", "keyword")
+        yield module, _snapshot(module, _RAG_STATE)
+
+
+@pytest.fixture
+def rag_module(_rag_module, monkeypatch):
+    """engine.rag_engine with an empty, not-yet-loaded index, searching by keyword."""
+    module, _ = _rag_module
+    monkeypatch.setattr(module, "_BACKEND", "keyword")
+    module.reset()
+    yield module
+    module.reset()
+
+
+@pytest.fixture(scope="module")
+def _indexed_rag(_rag_module, rag_corpus):
+    module, snapshot = _rag_module
+    with pytest.MonkeyPatch.context() as mp:
+        _restore(mp, module, snapshot)
+        module.index_pdfs(str(rag_corpus))
+        indexed = _snapshot(module, _RAG_STATE)
+    return module, indexed
+
+
+@pytest.fixture
+def indexed_rag(_indexed_rag, monkeypatch):
+    """engine.rag_engine holding an index of the test module's ``rag_corpus``.
+
+    The corpus is indexed once per module; each test gets that state back, so
+    read-only search tests skip PDF parsing. Tests that clear or rebuild the
+    index should use ``rag_module`` instead.
+    """
+    module, snapshot = _indexed_rag
+    return _restore(monkeypatch, module, snapshot)
+
+
+@pytest.fixture(scope="session")
+def rag_session(_rag_module):
+    """engine.rag_engine with the real embedding model loaded once for the session.
+
+    The model is warmed here through the memoized loader, so later
+    index_pdfs()/search_pdfs() calls reuse it, on the "auto" backend. Skips
+    unless embeddings are enabled and installed.
+    """
+    module, _ = _rag_module
+    if not (module._USE_EMB and module._EMB_AVAILABLE):
+        pytest.skip("Embeddings not enabled")
+    module.load_embedding_model()
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(module, "_BACKEND", "auto")
+        yield module
+
+
+_MAPPING_STATE = ("_mappings", "_metadata", "_MAPPING_FILE", "_keys_tuple", "_numeric_keys", "_by_category")
+
+
+@pytest.fixture
+def mapping_module(request, tmp_path, monkeypatch):
+    """engine.mapping_logic reloaded against a temp database seeded from ``request.param``.
+
+    Parametrize with ``indirect=True`` and a ``{ipc_section: mapping}`` dict; an
+    empty dict leaves the database empty so the module falls back to its defaults.
+    Only the mappings are reloaded (``_reload()``), not the module, and its
+    state is put back afterwards.
+    """
+    module = importlib.import_module("engine.mapping_logic")
+    for name in _MAPPING_STATE:
+        monkeypatch.setattr(module, name, getattr(module, name))
+
+    db = module.db
+    monkeypatch.setattr(db, "_DB_FILE", str(tmp_path / "m.sqlite"))
+    monkeypatch.setenv("LTA_MAPPING_DB", str(tmp_path / "m.json"))
+    db.initialize_db()
+    db.bulk_insert_mappings([
+        (
+            ipc_section,
+            mapping["bns_section"],
+            mapping.get("ipc_full_text", ""),
+            mapping.get("bns_full_text", ""),
+            mapping.get("notes", ""),
+            mapping.get("source", ""),
+            mapping.get("category", ""),
+        )
+        for ipc_section, mapping in getattr(request, "param", {}).items()
+    ])
+
+    module._reload()
+    yield module
+    # drop lookups memoized against the temp data; monkeypatch then restores the state
+    module._invalidate_indexes()
+    db.close_db_connections()
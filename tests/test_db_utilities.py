@@ -0,0 +1,480 @@
+"""
+Unit tests for engine/db.py
+
+Tests cover:
+- Lazy database initialization
+- Single-statement upsert of mappings
+- Batched inserts and connection pragmas
+- Lazy iteration over all mappings
+- Full-text search
+- CSV/Excel import normalization and atomicity
+- JSON migration
+- JSON and CSV export
+- Database backups
+"""
+
+import json
+import sqlite3
+import threading
+import uuid
+
+import pytest
+
+from engine import db
+
+
+# ============================================================================
+# Test Fixtures and Helpers
+# ============================================================================
+
+@pytest.fixture
+def temp_db(monkeypatch):
+    """Point the db module at an empty, initialized in-memory database."""
+    uri = f"file:lta_test_{uuid.uuid4().hex}?mode=memory&cache=shared"
+    monkeypatch.setattr(db, "_DB_FILE", uri)
+    # a shared in-memory database lives only while some connection is open
+    keeper = sqlite3.connect(uri, uri=True)
+    db.initialize_db()
+    # tables exist; skip the JSON migration, which keys off a file on disk
+    monkeypatch.setattr(db, "_initialized_db", uri)
+    yield db
+    db.close_db_connections()
+    keeper.close()
+
+
+# ============================================================================
+# Test Class: Initialization
+# ============================================================================
+
+class TestLazyInitialization:
+    """Tests for one-shot initialization on first connection."""
+
+    def test_first_connection_creates_tables(self, tmp_path, monkeypatch):
+        """A new database file should be initialized on first use, not on import."""
+        db_file = tmp_path / "lazy.sqlite"
+        monkeypatch.setattr(db, "_DB_FILE", str(db_file))
+        assert not db_file.exists()
+
+        assert db.get_mapping_count() == 0
+        assert db.upsert_mapping("420", "BNS 318") is not None
+        assert db._initialized_db == str(db_file)
+
+
+# ============================================================================
+# Test Class: Upsert
+# ============================================================================
+
+class TestUpsertMapping:
+    """Tests for the upsert_mapping() function."""
+
+    def test_upsert_inserts_new_mapping(self, temp_db):
+        """upsert_mapping should insert a section that does not exist yet."""
+        stored = temp_db.upsert_mapping("111", "BNS 111", notes="first")
+
+        assert stored is not None
+        assert stored["ipc_section"] == "111"
+        assert stored["bns_section"] == "BNS 111"
+        assert temp_db.get_mapping("111")["notes"] == "first"
+
+    def test_upsert_updates_existing_mapping(self, temp_db):
+        """upsert_mapping should overwrite an existing section in place."""
+        temp_db.upsert_mapping("111", "BNS 111", notes="first")
+        stored = temp_db.upsert_mapping("111", "BNS 112", notes="second", category="Updated")
+
+        assert stored["bns_section"] == "BNS 112"
+        assert stored["category"] == "Updated"
+        assert temp_db.get_mapping_count() == 1
+        assert temp_db.get_mapping("111")["notes"] == "second"
+
+    def test_upsert_joins_callers_transaction(self, temp_db):
+        """With conn given, upserts should commit or roll back with the caller's transaction."""
+        conn = temp_db._held_connection()
+        with conn:
+            temp_db.upsert_mapping("111", "BNS 111", conn=conn)
+            temp_db.upsert_mapping("222", "BNS 222", conn=conn)
+            assert conn.in_transaction
+        assert temp_db.get_mapping_count() == 2
+
+        with pytest.raises(RuntimeError):
+            with conn:
+                temp_db.upsert_mapping("333", "BNS 333", conn=conn)
+                raise RuntimeError("abort")
+        assert temp_db.get_mapping("333") is None
+
+    def test_bulk_upsert_inserts_and_updates(self, temp_db):
+        """bulk_upsert_mappings should write every row in one call, updating existing sections."""
+        temp_db.upsert_mapping("111", "BNS 111", notes="original")
+        rows = [
+            ("111", "BNS 112", "", "", "replacement", "test", "Test"),
+            ("222", "BNS 222", "", "", "new", "test", "Test"),
+        ]
+
+        assert temp_db.bulk_upsert_mappings(rows) == 2
+        assert temp_db.get_mapping_count() == 2
+        assert temp_db.get_mapping("111")["notes"] == "replacement"
+        assert not temp_db._held_connection().in_transaction
+
+
+# ============================================================================
+# Test Class: Bulk Insert
+# ============================================================================
+
+class TestBulkInsertMappings:
+    """Tests for bulk_insert_mappings() and connection setup."""
+
+    def test_bulk_insert_skips_existing_sections(self, temp_db):
+        """Existing sections should be left untouched and not counted."""
+        temp_db.upsert_mapping("111", "BNS 111", notes="original")
+        rows = [
+            ("111", "BNS 999", "", "", "replacement", "test", "Test"),
+            ("222", "BNS 222", "", "", "new", "test", "Test"),
+            ("333", "BNS 333", "", "", "new", "test", "Test"),
+        ]
+
+        assert temp_db.bulk_insert_mappings(rows) == 2
+        assert temp_db.get_mapping_count() == 3
+        assert temp_db.get_mapping("111")["notes"] == "original"
+
+    def test_helpers_reuse_one_connection_per_database(self, temp_db, tmp_path, monkeypatch):
+        """Helpers should share a held connection, separate per database file."""
+        first = temp_db._held_connection()
+        temp_db.upsert_mapping("111", "BNS 111")
+        assert temp_db.get_mapping_count() == 1
+        assert temp_db._held_connection() is first
+
+        monkeypatch.setattr(temp_db, "_DB_FILE", str(tmp_path / "other.sqlite"))
+        assert temp_db._held_connection() is not first
+        assert temp_db.get_mapping_count() == 0
+
+        temp_db.close_db_connections()
+        with pytest.raises(sqlite3.ProgrammingError):
+            first.execute("SELECT 1")
+
+    def test_failed_insert_leaves_no_open_transaction(self, temp_db):
+        """A duplicate insert should roll back so the held connection stays usable."""
+        assert temp_db.insert_mapping("111", "BNS 111") is True
+        assert temp_db.insert_mapping("111", "BNS 999") is False
+
+        assert not temp_db._held_connection().in_transaction
+        assert temp_db.get_mapping("111")["bns_section"] == "BNS 111"
+
+    def test_connections_use_wal_journal(self, tmp_path, monkeypatch):
+        """File-backed connections should run in WAL mode with a busy timeout."""
+        monkeypatch.setattr(db, "_DB_FILE", str(tmp_path / "wal.sqlite"))
+        monkeypatch.setattr(db, "_FAST_SQLITE", False)
+        conn = db.get_db_connection()
+        try:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 3000
+        finally:
+            conn.close()
+
+    def test_wal_switch_waits_for_another_connections_lock(self, tmp_path, monkeypatch):
+        """Opening a connection while another one holds a write lock should wait, not fail."""
+        path = str(tmp_path / "locked.sqlite")
+        monkeypatch.setattr(db, "_DB_FILE", path)
+        monkeypatch.setattr(db, "_FAST_SQLITE", False)
+        holder = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        holder.execute("CREATE TABLE t (x)")
+        holder.execute("BEGIN EXCLUSIVE")
+        releaser = threading.Timer(0.2, holder.execute, args=("COMMIT",))
+        releaser.start()
+        try:
+            conn = db._connect()
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            conn.close()
+        finally:
+            releaser.join()
+            holder.close()
+
+    def test_file_connections_read_through_mmap(self, tmp_path, monkeypatch):
+        """Databases that fit the mmap window get mmap reads and a capped page cache."""
+        monkeypatch.setattr(db, "_DB_FILE", str(tmp_path / "mapped.sqlite"))
+        monkeypatch.setattr(db, "_MMAP_SIZE", 1 << 20)
+        conn = db.get_db_connection()
+        try:
+            assert conn.execute("PRAGMA mmap_size").fetchone()[0] == 1 << 20
+            assert conn.execute("PRAGMA cache_size").fetchone()[0] == db._MMAP_CACHE_SIZE
+        finally:
+            conn.close()
+
+    def test_database_larger_than_mmap_window_is_not_mapped(self, tmp_path, monkeypatch):
+        """A file bigger than the window should keep plain reads and the default cache."""
+        path = tmp_path / "big.sqlite"
+        monkeypatch.setattr(db, "_DB_FILE", str(path))
+        db.initialize_db()
+        db.close_db_connections()
+        monkeypatch.setattr(db, "_MMAP_SIZE", path.stat().st_size - 1)
+        conn = db.get_db_connection()
+        try:
+            assert conn.execute("PRAGMA mmap_size").fetchone()[0] == 0
+            assert conn.execute("PRAGMA cache_size").fetchone()[0] != db._MMAP_CACHE_SIZE
+        finally:
+            conn.close()
+
+    def test_fast_sqlite_skips_journal_file_and_fsync(self, tmp_path, monkeypatch):
+        """LTA_TEST_FAST_SQLITE connections should journal in memory without syncing."""
+        monkeypatch.setattr(db, "_DB_FILE", str(tmp_path / "fast.sqlite"))
+        monkeypatch.setattr(db, "_FAST_SQLITE", True)
+        conn = db.get_db_connection()
+        try:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "memory"
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 0
+        finally:
+            conn.close()
+
+
+# ============================================================================
+# Test Class: Iteration
+# ============================================================================
+
+class TestIterAllMappings:
+    """Tests for iter_all_mappings()."""
+
+    def test_iter_yields_every_mapping_across_batches(self, temp_db):
+        """Iteration should cover all rows even when they span several fetch batches."""
+        temp_db.bulk_upsert_mappings([(str(n), f"BNS {n}", "", "", "", "test", "Test") for n in range(7)])
+
+        pairs = list(temp_db.iter_all_mappings(batch_size=3))
+
+        assert sorted(ipc for ipc, _ in pairs) == [str(n) for n in range(7)]
+        assert dict(pairs) == temp_db.get_all_mappings()
+        assert "ipc_section" not in pairs[0][1]
+
+
+# ============================================================================
+# Test Class: Full-text Search
+# ============================================================================
+
+class TestSearchMappings:
+    """Tests for the FTS5-backed search_mappings() function."""
+
+    def test_search_matches_legal_text_case_insensitively(self, temp_db):
+        """Words from the full text should find their mapping regardless of case or stem."""
+        temp_db.upsert_mapping("420", "BNS 318", ipc_full_text="Cheating and dishonestly inducing delivery of property.")
+        temp_db.upsert_mapping("302", "BNS 103", bns_full_text="Whoever commits murder shall be punished.")
+
+        assert list(temp_db.search_mappings("MURDER")) == ["302"]
+        assert list(temp_db.search_mappings("cheat")) == ["420"]
+        assert temp_db.search_mappings("dishonestly property")["420"]["bns_section"] == "BNS 318"
+
+    def test_search_follows_updates(self, temp_db):
+        """Updating a mapping's text should replace its indexed words."""
+        temp_db.upsert_mapping("378", "BNS 303", ipc_full_text="Theft of movable property.")
+        temp_db.upsert_mapping("378", "BNS 303", ipc_full_text="Snatching from a person.")
+
+        assert temp_db.search_mappings("theft") == {}
+        assert list(temp_db.search_mappings("snatching")) == ["378"]
+
+    def test_search_backfills_existing_rows(self, tmp_path, monkeypatch):
+        """Rows written before the index existed should become searchable."""
+        db_file = tmp_path / "legacy.sqlite"
+        conn = sqlite3.connect(db_file)
+        conn.execute(
+            "CREATE TABLE mappings (ipc_section TEXT PRIMARY KEY, bns_section TEXT NOT NULL, "
+            "ipc_full_text TEXT, bns_full_text TEXT, notes TEXT, source TEXT, category TEXT)"
+        )
+        conn.execute("INSERT INTO mappings VALUES ('302', 'BNS 103', 'Punishment for murder', '', '', '', '')")
+        conn.commit()
+        conn.close()
+        monkeypatch.setattr(db, "_DB_FILE", str(db_file))
+
+        assert list(db.search_mappings("murder")) == ["302"]
+
+    def test_search_handles_empty_and_special_queries(self, temp_db):
+        """Blank queries and FTS operators in user input should not raise."""
+        temp_db.upsert_mapping("302", "BNS 103", ipc_full_text="Section 302-A murder")
+
+        assert temp_db.search_mappings("") == {}
+        assert temp_db.search_mappings("   ") == {}
+        assert isinstance(temp_db.search_mappings('302-A "murder" OR NOT *'), dict)
+
+
+# ============================================================================
+# Test Class: Import
+# ============================================================================
+
+class TestImportMappings:
+    """Tests for import_mappings_from_csv() and import_mappings_from_excel()."""
+
+    def test_import_csv_strips_values_and_fills_defaults(self, temp_db, tmp_path):
+        """Imported cells should be stripped and missing optional columns defaulted."""
+        csv_file = tmp_path / "mappings.csv"
+        csv_file.write_text(
+            "ipc_section,bns_section,notes\n"
+            " 420 , BNS 318 , cheating \n"
+            "302,BNS 103,\n",
+            encoding="utf-8",
+        )
+
+        count, errors = temp_db.import_mappings_from_csv(str(csv_file))
+
+        assert errors == []
+        assert count == 2
+        cheating = temp_db.get_mapping("420")
+        assert cheating["bns_section"] == "BNS 318"
+        assert cheating["notes"] == "cheating"
+        assert cheating["source"] == "imported"
+        assert cheating["category"] == "Imported"
+        assert temp_db.get_mapping("302")["notes"] == ""
+
+    def test_import_csv_reports_missing_columns(self, temp_db, tmp_path):
+        """Files without the required columns should be rejected."""
+        csv_file = tmp_path / "bad.csv"
+        csv_file.write_text("ipc_section,notes\n420,cheating\n", encoding="utf-8")
+
+        count, errors = temp_db.import_mappings_from_csv(str(csv_file))
+
+        assert count == 0
+        assert "bns_section" in errors[0]
+
+    def test_import_csv_across_multiple_chunks(self, temp_db, tmp_path, monkeypatch):
+        """Rows spread over several read chunks should all be imported."""
+        monkeypatch.setattr(temp_db, "_IMPORT_CHUNK_SIZE", 2)
+        csv_file = tmp_path / "many.csv"
+        lines = ["ipc_section,bns_section"] + [f"{n},BNS {n}" for n in range(1, 6)]
+        csv_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+        count, errors = temp_db.import_mappings_from_csv(str(csv_file))
+
+        assert errors == []
+        assert count == 5
+        assert temp_db.get_mapping_count() == 5
+
+    def test_import_csv_is_atomic_when_a_later_chunk_fails(self, temp_db, tmp_path, monkeypatch):
+        """A parse error in a later chunk should roll back rows from earlier chunks."""
+        monkeypatch.setattr(temp_db, "_IMPORT_CHUNK_SIZE", 2)
+        csv_file = tmp_path / "broken.csv"
+        csv_file.write_text(
+            "ipc_section,bns_section\n1,BNS 1\n2,BNS 2\n3,BNS 3\n4,BNS 4,extra,extra\n",
+            encoding="utf-8",
+        )
+
+        count, errors = temp_db.import_mappings_from_csv(str(csv_file))
+
+        assert count == 0
+        assert errors and errors[0].startswith("Error reading CSV file")
+        assert temp_db.get_mapping_count() == 0
+
+    def test_import_excel(self, temp_db, tmp_path):
+        """Excel sheets should import through the same normalization path."""
+        pd = pytest.importorskip("pandas")
+        pytest.importorskip("openpyxl")
+        xlsx_file = tmp_path / "mappings.xlsx"
+        pd.DataFrame({
+            "ipc_section": ["420", "302"],
+            "bns_section": [" BNS 318", "BNS 103 "],
+            "category": ["Cheating", None],
+        }).to_excel(xlsx_file, index=False)
+
+        count, errors = temp_db.import_mappings_from_excel(str(xlsx_file))
+
+        assert errors == []
+        assert count == 2
+        assert temp_db.get_mapping("420")["bns_section"] == "BNS 318"
+        assert temp_db.get_mapping("302")["category"] == "Imported"
+
+
+# ============================================================================
+# Test Class: Migration
+# ============================================================================
+
+class TestMigrateFromJson:
+    """Tests for migrate_from_json()."""
+
+    def test_migrate_copies_mappings_and_metadata(self, tmp_path, monkeypatch):
+        """A fresh database should receive every mapping and metadata key."""
+        json_file = tmp_path / "mapping_db.json"
+        json_file.write_text(json.dumps({
+            "_metadata": {"version": "1.0.0", "sources": ["Gazette"]},
+            "420": {"bns_section": "BNS 318", "category": "Cheating"},
+            "302": {"bns_section": "BNS 103", "notes": "Punishment for murder"},
+        }), encoding="utf-8")
+        monkeypatch.setattr(db, "_JSON_FILE", str(json_file))
+        monkeypatch.setattr(db, "_DB_FILE", str(tmp_path / "migrated.sqlite"))
+
+        db.migrate_from_json()
+
+        assert db.get_mapping_count() == 2
+        assert db.get_mapping("420")["category"] == "Cheating"
+        assert db.get_mapping("302")["notes"] == "Punishment for murder"
+        assert db.get_metadata() == {"version": "1.0.0", "sources": ["Gazette"]}
+
+
+# ============================================================================
+# Test Class: Export
+# ============================================================================
+
+class TestExportMappings:
+    """Tests for export_mappings_to_json() and export_mappings_to_csv()."""
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_export_json_round_trips(self, temp_db, tmp_path, monkeypatch, use_orjson):
+        """Exported JSON should hold metadata and every mapping, with or without orjson."""
+        if not use_orjson:
+            monkeypatch.setattr(temp_db, "orjson", None)
+        elif temp_db.orjson is None:
+            pytest.skip("orjson not installed")
+        temp_db.upsert_mapping("420", "BNS 318", notes="धोखाधड़ी")
+        out_file = tmp_path / "export.json"
+
+        assert temp_db.export_mappings_to_json(str(out_file)) is True
+
+        data = json.loads(out_file.read_text(encoding="utf-8"))
+        assert data["_metadata"] == {}
+        assert data["420"]["bns_section"] == "BNS 318"
+        assert data["420"]["notes"] == "धोखाधड़ी"
+
+    def test_export_json_matches_stdlib_layout(self, temp_db, tmp_path):
+        """The streamed file should be laid out exactly like json.dump(indent=2)."""
+        temp_db.upsert_mapping("420", "BNS 318")
+        temp_db.upsert_mapping("302", "BNS 103")
+        out_file = tmp_path / "export.json"
+
+        assert temp_db.export_mappings_to_json(str(out_file)) is True
+
+        expected = {"_metadata": {}}
+        expected.update(temp_db.get_all_mappings())
+        assert out_file.read_text(encoding="utf-8") == json.dumps(expected, indent=2, ensure_ascii=False)
+
+    def test_export_csv_round_trips_through_import(self, temp_db, tmp_path):
+        """An exported CSV should import back into an identical table."""
+        temp_db.upsert_mapping("420", "BNS 318", notes="cheating, fraud", category="Cheating")
+        temp_db.upsert_mapping("302", "BNS 103", ipc_full_text="Whoever commits murder")
+        out_file = tmp_path / "export.csv"
+
+        assert temp_db.export_mappings_to_csv(str(out_file)) is True
+        # raw bytes: "\n" line endings, as pandas' to_csv wrote them
+        assert out_file.read_bytes() == (
+            b"ipc_section,bns_section,ipc_full_text,bns_full_text,notes,source,category\n"
+            b'420,BNS 318,,,"cheating, fraud",user,Cheating\n'
+            b"302,BNS 103,Whoever commits murder,,,user,User Added\n"
+        )
+
+        before = temp_db.get_all_mappings()
+        temp_db.import_mappings_from_csv(str(out_file))
+        assert temp_db.get_all_mappings() == before
+
+
+# ============================================================================
+# Test Class: Backup
+# ============================================================================
+
+class TestBackupDatabase:
+    """Tests for backup_database()."""
+
+    @pytest.mark.parametrize("compact", [False, True])
+    def test_backup_contains_all_mappings(self, temp_db, tmp_path, compact):
+        """The backup file should be a readable copy of the mappings table."""
+        temp_db.upsert_mapping("420", "BNS 318")
+        temp_db.upsert_mapping("302", "BNS 103")
+        backup_file = tmp_path / "backup.sqlite"
+
+        assert temp_db.backup_database(str(backup_file), compact=compact) is True
+
+        conn = sqlite3.connect(backup_file)
+        try:
+            rows = conn.execute("SELECT ipc_section FROM mappings ORDER BY ipc_section").fetchall()
+        finally:
+            conn.close()
+        assert rows == [("302",), ("420",)]
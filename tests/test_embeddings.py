@@ -13,27 +13,13 @@ Note: These tests use mocking to avoid requiring actual embedding dependencies.
 """
 
 import importlib
-import sys
+import inspect
 import os
 import pytest
 from unittest.mock import MagicMock, patch, mock_open
-from reportlab.pdfgen import canvas
 from pathlib import Path
 
 
-# ============================================================================
-# Test Fixtures and Helpers
-# ============================================================================
-
-def get_fresh_embeddings_module():
-    """
-    Get a fresh import of embeddings_engine to avoid state pollution.
-    """
-    if "engine.embeddings_engine" in sys.modules:
-        del sys.modules["engine.embeddings_engine"]
-    return importlib.import_module("engine.embeddings_engine")
-
-
 # ============================================================================
 # Test Class: Module Configuration
 # ============================================================================
@@ -41,132 +27,59 @@ def get_fresh_embeddings_module():
 class TestModuleConfiguration:
     """Tests for module-level configuration and availability."""
 
-    def test_emb_available_flag_exists(self):
+    def test_emb_available_flag_exists(self, embeddings_module):
         """Module should have _EMB_AVAILABLE flag."""
-        emb = get_fresh_embeddings_module()
+        emb = embeddings_module
         assert hasattr(emb, "_EMB_AVAILABLE")
         assert isinstance(emb._EMB_AVAILABLE, bool)
 
-    def test_use_emb_flag_exists(self):
+    def test_use_emb_flag_exists(self, embeddings_module):
         """Module should have _USE_EMB flag."""
-        emb = get_fresh_embeddings_module()
+        emb = embeddings_module
         assert hasattr(emb, "_USE_EMB")
         assert isinstance(emb._USE_EMB, bool)
 
-    def test_index_paths_defined(self):
+    def test_index_paths_defined(self, embeddings_module):
         """Module should define index storage paths."""
-        emb = get_fresh_embeddings_module()
+        emb = embeddings_module
         assert hasattr(emb, "_IDX_PATH")
         assert hasattr(emb, "_META_PATH")
         assert "faiss.index" in emb._IDX_PATH
         assert "meta.txt" in emb._META_PATH
 
-    def test_ensure_dir_function_exists(self):
+    def test_ensure_dir_function_exists(self, embeddings_module):
         """Module should have _ensure_dir helper function."""
-        emb = get_fresh_embeddings_module()
+        emb = embeddings_module
         assert hasattr(emb, "_ensure_dir")
         assert callable(emb._ensure_dir)
 
 
 # ============================================================================
-# Test Class: Build Index Function
-# ============================================================================
-
-class TestBuildIndex:
-    """Tests for the build_index() function."""
-
-    def test_build_index_returns_false_when_embeddings_unavailable(self):
-        """build_index should return False when embeddings not available."""
-        emb = get_fresh_embeddings_module()
-        
-        # If embeddings are not enabled, should return False
-        if not emb._EMB_AVAILABLE:
-            result = emb.build_index(["test text"], [("file.pdf", 1, "snippet")])
-            assert result is False
-
-    def test_build_index_accepts_correct_parameters(self):
-        """build_index should accept texts and metas parameters."""
-        emb = get_fresh_embeddings_module()
-        
-        # Verify function signature
-        import inspect
-        sig = inspect.signature(emb.build_index)
-        params = list(sig.parameters.keys())
-        
-        assert "texts" in params
-        assert "metas" in params
-
-    def test_build_index_handles_empty_inputs(self):
-        """build_index should handle empty inputs gracefully."""
-        emb = get_fresh_embeddings_module()
-        
-        # Should not crash with empty inputs
-        if not emb._EMB_AVAILABLE:
-            result = emb.build_index([], [])
-            assert result is False
-
-
-# ============================================================================
-# Test Class: Load Index Function
+# Test Class: Public Signatures
 # ============================================================================
 
-class TestLoadIndex:
-    """Tests for the load_index() function."""
-
-    def test_load_index_returns_false_when_embeddings_unavailable(self):
-        """load_index should return False when embeddings not available."""
-        emb = get_fresh_embeddings_module()
-        
-        if not emb._EMB_AVAILABLE:
-            result = emb.load_index()
-            assert result is False
-
-    def test_load_index_returns_false_when_no_index_file(self, tmp_path):
-        """load_index should return False when index files don't exist."""
-        emb = get_fresh_embeddings_module()
-        
-        # Even if embeddings available, should return False if no files
-        if not emb._EMB_AVAILABLE:
-            result = emb.load_index()
-            assert result is False
+@pytest.fixture(scope="module")
+def signature_params(_embeddings_module):
+    """Parameters of the public embeddings_engine functions, introspected once per module."""
+    module, _ = _embeddings_module
+    return {name: inspect.signature(getattr(module, name)).parameters for name in ("build_index", "search")}
 
 
-# ============================================================================
-# Test Class: Search Function
-# ============================================================================
+class TestPublicSignatures:
+    """Tests for the parameters of build_index() and search()."""
 
-class TestSearch:
-    """Tests for the search() function."""
-
-    def test_search_returns_none_when_embeddings_unavailable(self):
-        """search should return None when embeddings not available."""
-        emb = get_fresh_embeddings_module()
-        
-        if not emb._EMB_AVAILABLE:
-            result = emb.search("test query")
-            assert result is None
-
-    def test_search_accepts_query_and_top_k(self):
-        """search should accept query and top_k parameters."""
-        emb = get_fresh_embeddings_module()
-        
-        import inspect
-        sig = inspect.signature(emb.search)
-        params = list(sig.parameters.keys())
-        
-        assert "query" in params
-        assert "top_k" in params
+    @pytest.mark.parametrize("fn_name, param, default", [
+        ("build_index", "texts", inspect.Parameter.empty),
+        ("build_index", "metas", inspect.Parameter.empty),
+        ("search", "query", inspect.Parameter.empty),
+        ("search", "top_k", 3),
+    ])
+    def test_signature(self, signature_params, fn_name, param, default):
+        """Each public function should accept the documented parameters and defaults."""
+        params = signature_params[fn_name]
 
-    def test_search_default_top_k_is_3(self):
-        """search should have default top_k of 3."""
-        emb = get_fresh_embeddings_module()
-        
-        import inspect
-        sig = inspect.signature(emb.search)
-        top_k_param = sig.parameters.get("top_k")
-        
-        assert top_k_param is not None
-        assert top_k_param.default == 3
+        assert param in params
+        assert params[param].default == default
 
 
 # ============================================================================
@@ -176,29 +89,30 @@ class TestSearch:
 class TestGracefulDegradation:
     """Tests for graceful degradation when dependencies unavailable."""
 
-    def test_module_imports_without_dependencies(self):
+    def test_module_imports_without_dependencies(self, embeddings_module):
         """Module should import successfully even without embedding deps."""
-        # This test verifies the module doesn't crash on import
-        emb = get_fresh_embeddings_module()
-        assert emb is not None
+        assert embeddings_module is not None
+
+    @pytest.mark.parametrize("fn_name, args, expected", [
+        ("build_index", (["test text"], [("file.pdf", 1, "snippet")]), False),
+        ("build_index", ([], []), False),
+        ("load_index", (), False),
+        ("search", ("test query",), None),
+        ("_load_model", (), None),
+    ])
+    def test_returns_fallback_when_unavailable(self, embeddings_module, monkeypatch, fn_name, args, expected):
+        """Every entry point should return its fallback value when embeddings are off."""
+        monkeypatch.setattr(embeddings_module, "_EMB_AVAILABLE", False)
+
+        assert getattr(embeddings_module, fn_name)(*args) is expected
+
+    def test_load_index_returns_false_when_no_index_file(self, embeddings_module, monkeypatch, tmp_path):
+        """load_index should return False when index files don't exist."""
+        monkeypatch.setattr(embeddings_module, "_EMB_AVAILABLE", True)
+        monkeypatch.setattr(embeddings_module, "_IDX_PATH", str(tmp_path / "faiss.index"))
+        monkeypatch.setattr(embeddings_module, "_META_PATH", str(tmp_path / "meta.txt"))
 
-    def test_functions_dont_crash_without_dependencies(self):
-        """All functions should handle missing dependencies gracefully."""
-        emb = get_fresh_embeddings_module()
-        
-        # These should all return safely without crashing
-        if not emb._EMB_AVAILABLE:
-            assert emb.build_index(["text"], [("f", 1, "s")]) is False
-            assert emb.load_index() is False
-            assert emb.search("query") is None
-
-    def test_load_model_returns_none_when_unavailable(self):
-        """_load_model should return None when embeddings unavailable."""
-        emb = get_fresh_embeddings_module()
-        
-        if not emb._EMB_AVAILABLE:
-            result = emb._load_model()
-            assert result is None
+        assert embeddings_module.load_index() is False
 
 
 # ============================================================================
@@ -208,33 +122,33 @@ class TestGracefulDegradation:
 class TestEdgeCases:
     """Tests for edge cases and error handling."""
 
-    def test_search_with_empty_query(self):
+    def test_search_with_empty_query(self, embeddings_module):
         """search should handle empty query strings."""
-        emb = get_fresh_embeddings_module()
+        emb = embeddings_module
         
         # Should not crash
         result = emb.search("")
         assert result is None or isinstance(result, list)
 
-    def test_search_with_special_characters(self):
+    def test_search_with_special_characters(self, embeddings_module):
         """search should handle special characters in query."""
-        emb = get_fresh_embeddings_module()
+        emb = embeddings_module
         
         # Should not crash with special characters
         result = emb.search("IPC §302 — murder!")
         assert result is None or isinstance(result, list)
 
-    def test_search_with_unicode(self):
+    def test_search_with_unicode(self, embeddings_module):
         """search should handle unicode characters."""
-        emb = get_fresh_embeddings_module()
+        emb = embeddings_module
         
         # Should not crash with unicode
         result = emb.search("भारतीय दंड संहिता")
         assert result is None or isinstance(result, list)
 
-    def test_build_index_with_unicode_texts(self):
+    def test_build_index_with_unicode_texts(self, embeddings_module):
         """build_index should handle unicode in texts and metas."""
-        emb = get_fresh_embeddings_module()
+        emb = embeddings_module
         
         # Should not crash
         texts = ["भारतीय दंड संहिता धारा 302"]
@@ -249,33 +163,27 @@ class TestEdgeCases:
 # Test Class: Integration with Environment
 # ============================================================================
 
+@pytest.mark.xdist_group(name="env_mutating")
 class TestEnvironmentIntegration:
     """Tests for environment variable integration."""
 
-    def test_use_emb_reads_environment_variable(self, monkeypatch):
+    def test_use_emb_reads_environment_variable(self, embeddings_module, monkeypatch):
         """_USE_EMB should reflect LTA_USE_EMBEDDINGS environment variable."""
-        # Clear module cache
-        if "engine.embeddings_engine" in sys.modules:
-            del sys.modules["engine.embeddings_engine"]
-        
         # Set environment variable
         monkeypatch.setenv("LTA_USE_EMBEDDINGS", "1")
         
-        # Import fresh module
-        emb = importlib.import_module("engine.embeddings_engine")
+        # Re-run the module body; its compiled code is reused
+        emb = importlib.reload(embeddings_module)
         
         # _USE_EMB should be True (dependencies may still not be available)
         assert emb._USE_EMB is True
 
-    def test_use_emb_false_when_env_not_set(self, monkeypatch):
+    def test_use_emb_false_when_env_not_set(self, embeddings_module, monkeypatch):
         """_USE_EMB should be False when LTA_USE_EMBEDDINGS not set."""
-        if "engine.embeddings_engine" in sys.modules:
-            del sys.modules["engine.embeddings_engine"]
-        
         # Ensure variable is not set
         monkeypatch.delenv("LTA_USE_EMBEDDINGS", raising=False)
         
-        emb = importlib.import_module("engine.embeddings_engine")
+        emb = importlib.reload(embeddings_module)
         
         assert emb._USE_EMB is False
 
@@ -285,8 +193,11 @@ class TestEnvironmentIntegration:
 # ============================================================================
 
 @pytest.mark.skipif(os.environ.get("LTA_USE_EMBEDDINGS") != "1", reason="Embeddings not enabled")
-def test_embeddings_build_and_search(tmp_path):
+def test_embeddings_build_and_search(rag_session, tmp_path):
     """Integration test that runs when embeddings are enabled."""
+    # imported here so collecting this file doesn't pay for reportlab when skipped
+    from reportlab.pdfgen import canvas
+
     # generate simple PDF
     pdf_file = tmp_path / "emb_test.pdf"
     c = canvas.Canvas(str(pdf_file))
@@ -294,7 +205,7 @@ def test_embeddings_build_and_search(tmp_path):
     c.showPage()
     c.save()
 
-    rag = importlib.import_module("engine.rag_engine")
+    rag = rag_session
     # index the tmp dir
     assert rag.index_pdfs(str(tmp_path)) is True
 
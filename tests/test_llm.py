@@ -67,6 +67,16 @@ class TestExtractiveSummary:
         assert "\n" not in result, "Newlines should be replaced with spaces"
         assert "First sentence" in result, "Content should be preserved"
 
+    @pytest.mark.parametrize("text, expected", [
+        ("First. Second. Third. Fourth.", "First. Second. Third. "),
+        ("Only one sentence without period", "Only one sentence without period. "),
+        ("Fine of 3.5 lakh.\nNo bail! Or is there?", "Fine of 3.5 lakh. No bail! Or is there?. "),
+        ("...", ""),
+    ])
+    def test_extractive_summary_output_format(self, text, expected):
+        """Sentences are split on periods, joined with '. ' and always end in '. '."""
+        assert llm._extractive_summary(text) == expected
+
     def test_extractive_summary_single_sentence(self):
         """Verify handling of single sentence input."""
         text = "Just one sentence here."
@@ -230,6 +240,68 @@ class TestOllamaIntegration:
             llm_module.OLLAMA_URL = original_url
 
 
+    def test_summarize_reuses_shared_session(self, monkeypatch):
+        """Repeated summarize() calls should go through one keep-alive session."""
+        import engine.llm as llm_module
+
+        class MockResponse:
+            ok = True
+            headers = {"Content-Type": "application/json"}
+            content = b'{"response": "Session summary."}'
+            def __enter__(self):
+                return self
+            def __exit__(self, *exc):
+                return False
+
+        class MockSession:
+            def __init__(self):
+                self.calls = 0
+            def post(self, *args, **kwargs):
+                self.calls += 1
+                return MockResponse()
+
+        session = MockSession()
+        monkeypatch.setattr(llm_module, "_SESSION", session)
+        monkeypatch.setattr(llm_module, "OLLAMA_URL", "http://localhost:11434")
+
+        assert llm_module.summarize("First text.") == "Session summary."
+        assert llm_module.summarize("Second text.") == "Session summary."
+        assert session.calls == 2
+        assert llm_module._get_session() is session
+
+
+    def test_summarize_reads_ndjson_stream_incrementally(self, monkeypatch):
+        """NDJSON responses should be joined line by line, stopping at done."""
+        import engine.llm as llm_module
+
+        lines = [
+            '{"response": "Cheating is ", "done": false}',
+            "",
+            '{"response": "punishable.", "done": true}',
+            '{"response": " ignored after done"}',
+        ]
+
+        class MockStreamResponse:
+            ok = True
+            headers = {"Content-Type": "application/x-ndjson"}
+            def iter_lines(self, decode_unicode=False):
+                return iter(lines)
+            def __enter__(self):
+                return self
+            def __exit__(self, *exc):
+                return False
+
+        class MockSession:
+            def post(self, *args, **kwargs):
+                assert kwargs.get("stream") is True
+                return MockStreamResponse()
+
+        monkeypatch.setattr(llm_module, "_SESSION", MockSession())
+        monkeypatch.setattr(llm_module, "OLLAMA_URL", "http://localhost:11434")
+
+        assert llm_module.summarize("Text.") == "Cheating is punishable."
+
+
 class TestModuleConfiguration:
     """Tests for module-level configuration."""
 
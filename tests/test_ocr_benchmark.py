@@ -0,0 +1,102 @@
+"""
+Unit tests for scripts/ocr_benchmark.py
+
+Tests cover:
+- Edit distance and CER metric helpers
+- Sample discovery and the benchmark loop
+"""
+
+import importlib
+import io
+
+import pytest
+from PIL import Image
+
+from scripts import ocr_benchmark
+
+
+# ============================================================================
+# Test Class: Metric Helpers
+# ============================================================================
+
+class TestMetricHelpers:
+    """Tests for levenshtein() and cer()."""
+
+    @pytest.mark.parametrize("use_rapidfuzz", [True, False])
+    def test_metric_helpers(self, monkeypatch, use_rapidfuzz):
+        """Distances and CER should match the textbook definitions."""
+        if not use_rapidfuzz:
+            monkeypatch.setattr(ocr_benchmark, "_Lev", None)
+        elif ocr_benchmark._Lev is None:
+            pytest.skip("rapidfuzz not installed")
+
+        assert ocr_benchmark.levenshtein("kitten", "sitting") == 3
+        assert ocr_benchmark.levenshtein("", "abc") == 3
+        assert ocr_benchmark.levenshtein("abc", "") == 3
+        assert ocr_benchmark.levenshtein("section 420", "section 420") == 0
+        assert ocr_benchmark.levenshtein("धारा", "धार") == 1
+
+        assert ocr_benchmark.levenshtein("kitten", "sitting", max_dist=3) == 3
+        assert ocr_benchmark.levenshtein("kitten", "sitting", max_dist=2) == 3
+        assert ocr_benchmark.levenshtein("a", "abcdef", max_dist=1) == 2
+
+        assert ocr_benchmark.cer("abcd", "abcd") == 0.0
+        assert ocr_benchmark.cer("abcd", "abed") == 0.25
+        assert ocr_benchmark.cer("", "") == 0.0
+        assert ocr_benchmark.cer("", "x") == 1.0
+
+
+# ============================================================================
+# Test Class: Benchmark Loop
+# ============================================================================
+
+class TestRunBenchmark:
+    """Tests for find_samples() and run_benchmark()."""
+
+    def test_run_benchmark_scores_each_sample(self, tmp_path, monkeypatch):
+        """Every image with a transcript should be OCR'd and scored."""
+        buffer = io.BytesIO()
+        Image.new("RGB", (20, 20), color="white").save(buffer, format="PNG")
+        (tmp_path / "notice.png").write_bytes(buffer.getvalue())
+        (tmp_path / "notice.txt").write_text("SECTION 420", encoding="utf-8")
+        (tmp_path / "orphan.png").write_bytes(buffer.getvalue())
+
+        ocr_processor = importlib.import_module("engine.ocr_processor")
+        monkeypatch.setattr(ocr_processor, "extract_text", lambda data: "SECTION 42O")
+
+        results = ocr_benchmark.run_benchmark(str(tmp_path))
+
+        assert [r["file"] for r in results] == ["notice.png"]
+        assert results[0]["cer"] == round(1 / 11, 4)
+
+    @staticmethod
+    def _write_samples(dir_path, names):
+        buffer = io.BytesIO()
+        Image.new("RGB", (20, 20), color="white").save(buffer, format="PNG")
+        for name in names:
+            (dir_path / f"{name}.png").write_bytes(buffer.getvalue())
+            (dir_path / f"{name}.txt").write_text("SECTION 420", encoding="utf-8")
+
+    def test_run_benchmark_keeps_sample_order(self, tmp_path, monkeypatch):
+        """Runs should return one result per sample, in sample order."""
+        self._write_samples(tmp_path, ["c", "a", "b"])
+        ocr_processor = importlib.import_module("engine.ocr_processor")
+        monkeypatch.setattr(ocr_processor, "extract_text", lambda data: "SECTION 420")
+
+        results = ocr_benchmark.run_benchmark(str(tmp_path), workers=1)
+
+        assert [r["file"] for r in results] == ["a.png", "b.png", "c.png"]
+        assert all(set(r) == {"file", "cer", "seconds"} for r in results)
+
+    @pytest.mark.skipif(
+        len(importlib.import_module("engine.ocr_processor").available_engines()) == 0,
+        reason="No OCR engines available (install easyocr or pytesseract)"
+    )
+    def test_run_benchmark_in_process_pool_keeps_sample_order(self, tmp_path):
+        """Parallel runs should match the sample order too (loads the real OCR model per worker)."""
+        self._write_samples(tmp_path, ["a", "b", "c"])
+
+        results = ocr_benchmark.run_benchmark(str(tmp_path), workers=2)
+
+        assert [r["file"] for r in results] == ["a.png", "b.png", "c.png"]
+        assert all(set(r) == {"file", "cer", "seconds"} for r in results)
@@ -6,12 +6,15 @@ This module tests the OCR functionality including:
 - Text extraction from valid images
 - Graceful fallback when OCR engines are not configured
 - Error handling for invalid/corrupted input
+- One-time loading of the EasyOCR reader
 
 Author: Savani Thakur
 Date: 2026-02-09
 """
 
 import io
+import sys
+import types
 import pytest
 from PIL import Image, ImageDraw, ImageFont
 
@@ -135,6 +138,57 @@ class TestExtractText:
         assert isinstance(result, str), "Should return string for empty input"
 
 
+class TestReaderCache:
+    """Tests for process-wide caching of the EasyOCR reader."""
+
+    @pytest.fixture
+    def fake_easyocr(self, monkeypatch):
+        """Install a stand-in easyocr module that records how it is used."""
+        calls = {"readers": 0, "readtext": []}
+
+        class FakeReader:
+            def __init__(self, langs, gpu=True):
+                calls["readers"] += 1
+
+            def readtext(self, image, **kwargs):
+                calls["readtext"].append(kwargs)
+                return ["LEGAL NOTICE", "SECTION 420"]
+
+        monkeypatch.setitem(sys.modules, "easyocr", types.SimpleNamespace(Reader=FakeReader))
+        ocr_processor._get_reader.cache_clear()
+        ocr_processor.load_easyocr_reader.clear()
+        yield calls
+        ocr_processor._get_reader.cache_clear()
+        ocr_processor.load_easyocr_reader.clear()
+
+    def test_reader_is_built_once_across_calls(self, fake_easyocr):
+        """Repeated extract_text() calls should reuse a single reader."""
+        img = Image.new("RGB", (40, 20), color="white")
+        buffer = io.BytesIO()
+        img.save(buffer, format="PNG")
+
+        for _ in range(3):
+            result = ocr_processor.extract_text(buffer.getvalue())
+
+        assert result == "LEGAL NOTICE SECTION 420"
+        assert fake_easyocr["readers"] == 1
+        assert fake_easyocr["readtext"][0] == {"detail": 0, "paragraph": True}
+
+    def test_image_is_decoded_to_rgb_array(self, fake_easyocr, monkeypatch):
+        """Backends should receive one RGB array, whatever the source mode."""
+        seen = []
+        monkeypatch.setattr(
+            sys.modules["easyocr"].Reader, "readtext",
+            lambda self, image, **kwargs: seen.append(image) or ["ok"],
+        )
+        img = Image.new("L", (40, 20), color=255)
+        buffer = io.BytesIO()
+        img.save(buffer, format="PNG")
+
+        assert ocr_processor.extract_text(buffer.getvalue()) == "ok"
+        assert seen[0].shape == (20, 40, 3)
+
+
 class TestOCRIntegration:
     """
     Integration tests that verify OCR works end-to-end when engines are available.
@@ -5,46 +5,113 @@ Tests cover:
 - PDF indexing (index_pdfs)
 - PDF search (search_pdfs)
 - Index management (clear_index, add_pdf)
+- Embedding search (with a deterministic stand-in encoder)
 - Edge cases and error handling
 """
 
+import functools
 import os
-import sys
-import importlib
+import time
+import numpy as np
 import pytest
-from reportlab.pdfgen import canvas
 
 
 # ============================================================================
 # Test Fixtures and Helpers
 # ============================================================================
 
+def _pdf_escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+@functools.lru_cache(maxsize=None)
+def _render_pdf_bytes(pages_text):
+    """Build a minimal PDF with one Helvetica line per page; cached per distinct input."""
+    n = len(pages_text)
+    kids = " ".join(f"{4 + 2 * i} 0 R" for i in range(n))
+    objects = [
+        b"<</Type/Catalog/Pages 2 0 R>>",
+        f"<</Type/Pages/Kids[{kids}]/Count {n}>>".encode(),
+        b"<</Type/Font/Subtype/Type1/BaseFont/Helvetica>>",
+    ]
+    for i, text in enumerate(pages_text):
+        stream = f"BT /F1 12 Tf 50 800 Td ({_pdf_escape(text)}) Tj ET".encode("latin-1")
+        objects.append(
+            f"<</Type/Page/Parent 2 0 R/MediaBox[0 0 612 792]/Contents {5 + 2 * i} 0 R"
+            f"/Resources<</Font<</F1 3 0 R>>>>>>".encode()
+        )
+        objects.append(b"<</Length %d>>stream\n%s\nendstream" % (len(stream), stream))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for num, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj%s endobj\n" % (num, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer<</Size %d/Root 1 0 R>>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
 def make_pdf(path, text):
     """Create a simple PDF with given text."""
-    c = canvas.Canvas(str(path))
-    c.setFont("Helvetica", 12)
-    c.drawString(50, 800, text)
-    c.showPage()
-    c.save()
+    path.write_bytes(_render_pdf_bytes((text,)))
 
 
 def make_multipage_pdf(path, pages_text):
     """Create a multi-page PDF with given text per page."""
-    c = canvas.Canvas(str(path))
-    for text in pages_text:
-        c.setFont("Helvetica", 12)
-        c.drawString(50, 800, text)
-        c.showPage()
-    c.save()
+    path.write_bytes(_render_pdf_bytes(tuple(pages_text)))
+
+
+_MULTIPAGE_TEXT = (
+    "Page 1: IPC Section 302 deals with murder.",
+    "Page 2: IPC Section 376 deals with assault.",
+    "Page 3: IPC Section 420 deals with cheating.",
+)
+
+
+@pytest.fixture(scope="session")
+def pdf_corpus(tmp_path_factory):
+    """Read-only directory of PDFs (plus non-PDF files) written once per session."""
+    corpus = tmp_path_factory.mktemp("pdfs", numbered=False)
+    make_pdf(corpus / "doc1.pdf", "Document about theft under IPC 379.")
+    make_pdf(corpus / "doc2.pdf", "Document about murder under IPC 302.")
+    make_pdf(corpus / "doc3.pdf", "Document about fraud under IPC 420.")
+    make_pdf(corpus / "legal.pdf", "Legal document content.")
+    make_multipage_pdf(corpus / "multipage.pdf", _MULTIPAGE_TEXT)
+    (corpus / "notes.txt").write_text("Some notes.")
+    (corpus / "data.json").write_text("{}")
+    return corpus
+
+
+@pytest.fixture(scope="module")
+def rag_corpus(tmp_path_factory):
+    """PDFs behind the shared ``indexed_rag`` index used by the read-only search tests."""
+    corpus = tmp_path_factory.mktemp("rag_corpus")
+    make_pdf(corpus / "sample_test.pdf", "This document is about theft and BNS section 303.")
+    make_pdf(corpus / "murder.pdf", "This document discusses MURDER under IPC.")
+    make_pdf(corpus / "homicide.pdf", "IPC Section 302 covers murder and homicide.")
+    make_pdf(corpus / "legal.pdf", "Section 420 of IPC covers cheating.")
+    make_pdf(corpus / "special.pdf", "Section 302-A of the IPC.")
+    for i in range(5):
+        make_pdf(corpus / f"crime{i}.pdf", f"Document {i} about crime.")
+    return corpus
 
 
-def get_fresh_rag_module():
-    """
-    Get a fresh import of rag_engine to avoid state pollution between tests.
-    """
-    if "engine.rag_engine" in sys.modules:
-        del sys.modules["engine.rag_engine"]
-    return importlib.import_module("engine.rag_engine")
+_FAKE_VOCAB = ["theft", "murder", "cheating", "property", "punishment", "fraud"]
+
+
+class FakeEmbeddingModel:
+    """Deterministic bag-of-words encoder standing in for SentenceTransformer."""
+
+    def encode(self, texts, convert_to_numpy=True, show_progress_bar=False, **kwargs):
+        import numpy as np
+        rows = []
+        for text in texts:
+            words = [w.strip(".,:;") for w in text.lower().split()]
+            rows.append([float(words.count(v)) for v in _FAKE_VOCAB] + [0.01])
+        return np.asarray(rows, dtype=np.float32)
 
 
 # ============================================================================
@@ -54,69 +121,91 @@ def get_fresh_rag_module():
 class TestIndexPdfs:
     """Tests for the index_pdfs() function."""
 
-    def test_index_pdfs_returns_true_on_success(self, tmp_path):
+    def test_index_pdfs_returns_true_on_success(self, rag_module, tmp_path):
         """index_pdfs should return True when successful."""
         pdf_file = tmp_path / "test.pdf"
         make_pdf(pdf_file, "Sample legal document about IPC Section 302.")
         
-        rag = get_fresh_rag_module()
+        rag = rag_module
         result = rag.index_pdfs(str(tmp_path))
         
         assert result is True
 
-    def test_index_pdfs_empty_directory(self, tmp_path):
+    def test_index_pdfs_empty_directory(self, rag_module, tmp_path):
         """index_pdfs should handle empty directories gracefully."""
-        rag = get_fresh_rag_module()
+        rag = rag_module
         result = rag.index_pdfs(str(tmp_path))
         
         assert result is True
 
-    def test_index_pdfs_creates_directory_if_missing(self, tmp_path):
+    def test_index_pdfs_creates_directory_if_missing(self, rag_module, tmp_path):
         """index_pdfs should create the directory if it doesn't exist."""
         nonexistent_dir = tmp_path / "new_pdf_dir"
         
-        rag = get_fresh_rag_module()
+        rag = rag_module
         result = rag.index_pdfs(str(nonexistent_dir))
         
         assert result is True
         assert nonexistent_dir.exists()
 
-    def test_index_pdfs_processes_multiple_files(self, tmp_path):
+    def test_index_pdfs_processes_multiple_files(self, rag_module, pdf_corpus):
         """index_pdfs should process multiple PDF files."""
-        make_pdf(tmp_path / "doc1.pdf", "Document about theft under IPC 379.")
-        make_pdf(tmp_path / "doc2.pdf", "Document about murder under IPC 302.")
-        make_pdf(tmp_path / "doc3.pdf", "Document about fraud under IPC 420.")
-        
-        rag = get_fresh_rag_module()
-        result = rag.index_pdfs(str(tmp_path))
+        rag = rag_module
+        result = rag.index_pdfs(str(pdf_corpus))
         
         assert result is True
+        indexed = {d["file"] for d in rag._INDEX}
+        assert {"doc1.pdf", "doc2.pdf", "doc3.pdf"} <= indexed
 
-    def test_index_pdfs_handles_multipage_pdf(self, tmp_path):
+    def test_index_pdfs_handles_multipage_pdf(self, rag_module, pdf_corpus):
         """index_pdfs should index all pages of a multi-page PDF."""
-        pdf_file = tmp_path / "multipage.pdf"
-        make_multipage_pdf(pdf_file, [
-            "Page 1: IPC Section 302 deals with murder.",
-            "Page 2: IPC Section 376 deals with assault.",
-            "Page 3: IPC Section 420 deals with cheating."
-        ])
-        
-        rag = get_fresh_rag_module()
-        result = rag.index_pdfs(str(tmp_path))
+        rag = rag_module
+        result = rag.index_pdfs(str(pdf_corpus))
         
         assert result is True
+        pages = [d["page"] for d in rag._INDEX if d["file"] == "multipage.pdf"]
+        assert pages == [1, 2, 3]
 
-    def test_index_pdfs_ignores_non_pdf_files(self, tmp_path):
+    def test_index_pdfs_parallel_matches_sequential(self, rag_module, tmp_path, monkeypatch):
+        """Extracting across processes should index the same pages in the same order."""
+        for i in range(3):
+            make_multipage_pdf(tmp_path / f"act{i}.pdf", [f"Act {i} page one.", f"Act {i} page two."])
+        (tmp_path / "broken.pdf").write_bytes(b"not a pdf")
+
+        rag = rag_module
+        monkeypatch.setattr(rag, "_PARALLEL_MIN_FILES", 1)
+        rag.index_pdfs(str(tmp_path))
+        parallel = [(d["file"], d["page"], d["text"]) for d in rag._INDEX]
+
+        monkeypatch.setattr(rag, "_PARALLEL_MIN_FILES", 10 ** 6)
+        rag.clear_index()  # otherwise the unchanged directory is not re-read
+        rag.index_pdfs(str(tmp_path))
+        sequential = [(d["file"], d["page"], d["text"]) for d in rag._INDEX]
+
+        assert len(parallel) == 6
+        assert parallel == sequential
+
+    def test_index_pdfs_falls_back_when_pool_cannot_start(self, rag_module, tmp_path, monkeypatch):
+        """If worker processes cannot be started, extraction should run in this process."""
+        def no_pool(*args, **kwargs):
+            raise OSError("cannot spawn")
+
+        for i in range(2):
+            make_pdf(tmp_path / f"act{i}.pdf", f"Act {i} on bail.")
+        rag = rag_module
+        monkeypatch.setattr(rag, "_PARALLEL_MIN_FILES", 1)
+        monkeypatch.setattr(rag, "ProcessPoolExecutor", no_pool)
+
+        assert rag.index_pdfs(str(tmp_path)) is True
+        assert sorted(d["file"] for d in rag._INDEX) == ["act0.pdf", "act1.pdf"]
+
+    def test_index_pdfs_ignores_non_pdf_files(self, rag_module, pdf_corpus):
         """index_pdfs should only process .pdf files."""
-        # Create a PDF and some non-PDF files
-        make_pdf(tmp_path / "legal.pdf", "Legal document content.")
-        (tmp_path / "notes.txt").write_text("Some notes.")
-        (tmp_path / "data.json").write_text("{}")
-        
-        rag = get_fresh_rag_module()
-        result = rag.index_pdfs(str(tmp_path))
+        rag = rag_module
+        result = rag.index_pdfs(str(pdf_corpus))
         
         assert result is True
+        assert all(d["file"].endswith(".pdf") for d in rag._INDEX)
 
 
 # ============================================================================
@@ -126,92 +215,90 @@ class TestIndexPdfs:
 class TestSearchPdfs:
     """Tests for the search_pdfs() function."""
 
-    def test_search_pdfs_finds_matching_content(self, tmp_path):
-        """search_pdfs should find documents containing query terms."""
-        pdf_file = tmp_path / "sample_test.pdf"
-        make_pdf(pdf_file, "This document is about theft and BNS section 303.")
-        
-        rag = get_fresh_rag_module()
-        rag.index_pdfs(str(tmp_path))
-        
-        result = rag.search_pdfs("theft")
-        
+    @pytest.mark.parametrize("query, top_source", [
+        ("theft", "sample_test.pdf"),         # single matching document
+        ("murder", "murder.pdf"),             # "MURDER" in the PDF, lower-case query
+        ("murder homicide", "homicide.pdf"),  # the page with both terms ranks first
+        ("cheating", "legal.pdf"),
+        ("302-A", "special.pdf"),             # punctuation inside the query
+    ])
+    def test_search_variants(self, indexed_rag, query, top_source):
+        """Each query should return markdown results led by the expected document."""
+        result = indexed_rag.search_pdfs(query)
+
         assert result is not None
-        assert "sample_test.pdf" in result
+        assert "**Source:**" in result and "**Page:**" in result
+        assert result.index("**Source:**") == result.index(f"**Source:** {top_source}")
 
-    def test_search_pdfs_returns_none_for_empty_query(self, tmp_path):
-        """search_pdfs should return None for empty or whitespace queries."""
-        make_pdf(tmp_path / "doc.pdf", "Some content here.")
-        
-        rag = get_fresh_rag_module()
-        rag.index_pdfs(str(tmp_path))
-        
+    def test_search_pdfs_returns_none_for_empty_query(self, rag_module):
+        """Empty or whitespace queries should return None without touching the index."""
+        rag = rag_module
         assert rag.search_pdfs("") is None
         assert rag.search_pdfs("   ") is None
         assert rag.search_pdfs(None) is None
+        # the short-circuit runs before the lazy index_pdfs() of the default folder
+        assert rag._INDEX_LOADED is False
 
-    def test_search_pdfs_returns_none_for_no_matches(self, tmp_path):
+    def test_search_pdfs_returns_none_for_no_matches(self, indexed_rag):
         """search_pdfs should return None when no documents match."""
-        make_pdf(tmp_path / "doc.pdf", "This is about criminal law.")
-        
-        rag = get_fresh_rag_module()
-        rag.index_pdfs(str(tmp_path))
-        
+        rag = indexed_rag
         result = rag.search_pdfs("xyz123nonexistent")
         
         assert result is None
 
-    def test_search_pdfs_case_insensitive(self, tmp_path):
-        """search_pdfs should be case-insensitive."""
-        make_pdf(tmp_path / "doc.pdf", "This document discusses MURDER under IPC.")
-        
-        rag = get_fresh_rag_module()
+    def test_search_pdfs_matches_whole_words_ignoring_punctuation(self, rag_module, tmp_path):
+        """Query tokens should be matched as words, with punctuation ignored."""
+        make_pdf(tmp_path / "theft.pdf", "Punishment for theft, as defined.")
+        make_pdf(tmp_path / "other.pdf", "Rules about thefts in general.")
+
+        rag = rag_module
         rag.index_pdfs(str(tmp_path))
-        
-        result = rag.search_pdfs("murder")
-        
+
+        result = rag.search_pdfs("theft?")
+
         assert result is not None
-        assert "doc.pdf" in result
+        assert "theft.pdf" in result
+        assert "other.pdf" not in result
+
+    def test_search_pdfs_ranks_pages_by_term_count(self, rag_module, tmp_path):
+        """Pages with more query-term occurrences should be listed first."""
+        make_multipage_pdf(tmp_path / "code.pdf", [
+            "Bail is discussed once.",
+            "Bail and bail again, bail everywhere.",
+            "Nothing relevant here.",
+        ])
 
-    def test_search_pdfs_multiple_terms(self, tmp_path):
-        """search_pdfs should handle multiple search terms."""
-        make_pdf(tmp_path / "doc.pdf", "IPC Section 302 covers murder and homicide.")
-        
-        rag = get_fresh_rag_module()
+        rag = rag_module
         rag.index_pdfs(str(tmp_path))
-        
-        result = rag.search_pdfs("murder homicide")
-        
-        assert result is not None
 
-    def test_search_pdfs_returns_markdown_format(self, tmp_path):
-        """search_pdfs should return results in markdown format."""
-        make_pdf(tmp_path / "legal.pdf", "Section 420 of IPC covers cheating.")
-        
-        rag = get_fresh_rag_module()
+        result = rag.search_pdfs("bail", top_k=3)
+
+        assert result.count("**Source:**") == 2
+        assert result.index("**Page:** 2") < result.index("**Page:** 1")
+
+    def test_search_pdfs_snippet_starts_near_first_hit(self, rag_module, tmp_path):
+        """The snippet should open just before the earliest query-term hit."""
+        lead = "Preamble text that is not relevant to the search at all, "
+        make_pdf(tmp_path / "doc.pdf", lead + "then extortion and later theft.")
+
+        rag = rag_module
         rag.index_pdfs(str(tmp_path))
-        
-        result = rag.search_pdfs("cheating")
-        
-        assert result is not None
-        assert "**Source:**" in result
-        assert "**Page:**" in result
 
-    def test_search_pdfs_respects_top_k(self, tmp_path):
+        result = rag.search_pdfs("theft extortion")
+
+        assert "Preamble" not in result
+        assert "all, then extortion and later theft." in result
+
+    def test_search_pdfs_respects_top_k(self, indexed_rag):
         """search_pdfs should respect the top_k parameter."""
-        # Create multiple PDFs with the same keyword
-        for i in range(5):
-            make_pdf(tmp_path / f"doc{i}.pdf", f"Document {i} about theft and crime.")
-        
-        rag = get_fresh_rag_module()
-        rag.index_pdfs(str(tmp_path))
-        
-        result = rag.search_pdfs("theft", top_k=2)
-        
-        assert result is not None
-        # Count occurrences of "Source:" to verify top_k limit
-        source_count = result.count("**Source:**")
-        assert source_count <= 2
+        # five crime*.pdf documents share the keyword
+        rag = indexed_rag
+        hits = rag.search_pdfs("crime", top_k=2, return_structured=True)
+
+        assert hits is not None
+        assert len(hits) == 2
+        assert all(h["source"].startswith("crime") for h in hits)
+        assert hits[0]["score"] >= hits[1]["score"]
 
 
 # ============================================================================
@@ -221,11 +308,11 @@ class TestSearchPdfs:
 class TestIndexManagement:
     """Tests for clear_index() and add_pdf() functions."""
 
-    def test_clear_index_resets_state(self, tmp_path):
+    def test_clear_index_resets_state(self, rag_module, tmp_path):
         """clear_index should reset the index to empty state."""
         make_pdf(tmp_path / "doc.pdf", "Some searchable content here.")
         
-        rag = get_fresh_rag_module()
+        rag = rag_module
         rag.index_pdfs(str(tmp_path))
         
         # Verify content is indexed
@@ -235,16 +322,257 @@ class TestIndexManagement:
         rag.clear_index()
         assert rag.search_pdfs("searchable") is None
 
-    def test_add_pdf_reindexes_directory(self, tmp_path):
+    def test_reset_returns_to_unloaded_state(self, rag_module, tmp_path):
+        """reset() should drop the index and let the next search index lazily again."""
+        make_pdf(tmp_path / "doc.pdf", "Some searchable content here.")
+
+        rag = rag_module
+        rag.index_pdfs(str(tmp_path))
+        rag.reset()
+
+        assert rag._INDEX == [] and rag._POSTINGS == {}
+        assert rag._INDEX_LOADED is False
+
+    def test_add_pdf_reindexes_directory(self, rag_module, tmp_path):
         """add_pdf should trigger re-indexing of the directory."""
         pdf_file = tmp_path / "new_doc.pdf"
         make_pdf(pdf_file, "New document about extortion.")
         
-        rag = get_fresh_rag_module()
+        rag = rag_module
         result = rag.add_pdf(str(pdf_file))
         
         assert result is True
 
+    def test_index_pdfs_skips_unchanged_directory(self, rag_module, tmp_path, monkeypatch):
+        """Re-indexing an unchanged directory should not re-read its PDFs; a new file should."""
+        make_pdf(tmp_path / "a.pdf", "Bail provisions.")
+        rag = rag_module
+        calls = []
+        extract_all = rag._extract_all
+        monkeypatch.setattr(rag, "_extract_all", lambda files: calls.append(files) or extract_all(files))
+
+        assert rag.index_pdfs(str(tmp_path)) is True
+        assert rag.index_pdfs(str(tmp_path)) is True
+        assert len(calls) == 1
+
+        make_pdf(tmp_path / "b.pdf", "Anticipatory bail.")
+        rag.index_pdfs(str(tmp_path))
+        assert len(calls) == 2
+        assert rag.search_pdfs("anticipatory") is not None
+
+    def test_index_pdfs_tolerates_file_removed_after_listing(self, rag_module, tmp_path, monkeypatch):
+        """A PDF deleted between the glob and indexing should be skipped, not raise."""
+        make_pdf(tmp_path / "a.pdf", "Bail provisions.")
+        rag = rag_module
+        glob = rag.glob.glob
+        monkeypatch.setattr(rag.glob, "glob", lambda pattern: glob(pattern) + [str(tmp_path / "gone.pdf")])
+
+        assert rag.index_pdfs(str(tmp_path)) is True
+        assert rag.search_pdfs("bail") is not None
+
+
+# ============================================================================
+# Test Class: Embedding Search
+# ============================================================================
+
+class TestEmbeddingSearch:
+    """Tests for the internal embedding search path."""
+
+    @pytest.fixture
+    def emb_rag(self, rag_module, monkeypatch, tmp_path):
+        monkeypatch.delenv("LTA_USE_EMBEDDINGS", raising=False)
+        rag = rag_module
+        monkeypatch.setattr(rag, "_BACKEND", "auto")
+        monkeypatch.setattr(rag, "_USE_EMB", True)
+        monkeypatch.setattr(rag, "_EMB_AVAILABLE", True)
+        monkeypatch.setattr(rag, "_EMB_CACHE_DIR", str(tmp_path / "vector_store"))
+        monkeypatch.setattr(rag, "load_embedding_model", lambda: FakeEmbeddingModel())
+        return rag
+
+    def test_emb_search_ranks_most_similar_page_first(self, emb_rag, tmp_path):
+        """The page closest to the query should be the top result."""
+        make_pdf(tmp_path / "theft.pdf", "Theft of property is punishable.")
+        make_pdf(tmp_path / "murder.pdf", "Murder and its punishment.")
+        make_pdf(tmp_path / "fraud.pdf", "Cheating and fraud.")
+        assert emb_rag.index_pdfs(str(tmp_path)) is True
+
+        result = emb_rag.search_pdfs("murder", top_k=1)
+
+        assert result is not None
+        assert "embedding search" in result
+        assert "murder.pdf" in result
+        assert result.count("**Source:**") == 1
+
+    def test_emb_search_orders_results_by_score(self, emb_rag, tmp_path):
+        """Results should come back best score first, capped at top_k."""
+        make_pdf(tmp_path / "a.pdf", "Cheating and fraud and fraud.")
+        make_pdf(tmp_path / "b.pdf", "Theft of property.")
+        make_pdf(tmp_path / "c.pdf", "Fraud in property sale.")
+        emb_rag.index_pdfs(str(tmp_path))
+
+        result = emb_rag.search_pdfs("fraud", top_k=2)
+
+        assert result.count("**Source:**") == 2
+        assert result.index("a.pdf") < result.index("c.pdf")
+        assert "b.pdf" not in result
+
+        hits = emb_rag.search_pdfs("fraud", top_k=2, return_structured=True)
+        assert [h["source"] for h in hits] == ["a.pdf", "c.pdf"]
+        assert hits[0]["score"] >= hits[1]["score"]
+
+    def test_keyword_backend_skips_embeddings(self, emb_rag, tmp_path, monkeypatch):
+        """set_backend("keyword") should index and search without the model."""
+        monkeypatch.setattr(emb_rag, "load_embedding_model", lambda: pytest.fail("model loaded"))
+        make_pdf(tmp_path / "murder.pdf", "Murder and its punishment.")
+
+        emb_rag.set_backend("keyword")
+        emb_rag.index_pdfs(str(tmp_path))
+        result = emb_rag.search_pdfs("murder")
+
+        assert emb_rag._EMB_MATRIX is None
+        assert "grounded snippets" in result and "murder.pdf" in result
+        with pytest.raises(ValueError):
+            emb_rag.set_backend("bm25s")
+
+    def test_chunks_overlap_and_cover_every_word(self, emb_rag):
+        """Windows should overlap by the given amount and reach the last word."""
+        words = [f"w{i}" for i in range(11)]
+
+        chunks = emb_rag._chunks(" ".join(words), size=4, overlap=1)
+
+        assert chunks[0] == "w0 w1 w2 w3"
+        assert chunks[1].split()[0] == "w3"
+        assert chunks[-1].split()[-1] == "w10"
+        assert emb_rag._chunks("short page", size=4, overlap=1) == ["short page"]
+
+    def test_emb_search_scores_long_page_by_its_best_chunk(self, emb_rag, tmp_path, monkeypatch):
+        """A term deep inside a multi-chunk page should surface that page once."""
+        monkeypatch.setattr(emb_rag, "_CHUNK_WORDS", 4)
+        monkeypatch.setattr(emb_rag, "_CHUNK_OVERLAP", 1)
+        make_pdf(tmp_path / "long.pdf", "Rules on property and property and property then murder at the end.")
+        make_pdf(tmp_path / "short.pdf", "Theft of property.")
+        emb_rag.index_pdfs(str(tmp_path))
+
+        assert emb_rag._EMB_MATRIX.shape[0] > len(emb_rag._EMB_FILES)
+        result = emb_rag.search_pdfs("murder", top_k=2)
+
+        assert result.index("long.pdf") < result.index("short.pdf")
+        assert result.count("long.pdf") == 1
+
+    def test_index_pdfs_reuses_cached_embeddings(self, emb_rag, tmp_path, monkeypatch):
+        """Re-indexing unchanged PDFs should load the saved matrix, not re-encode."""
+        calls = []
+
+        class CountingModel(FakeEmbeddingModel):
+            def encode(self, texts, **kwargs):
+                calls.append(len(texts))
+                return super().encode(texts, **kwargs)
+
+        monkeypatch.setattr(emb_rag, "load_embedding_model", lambda: CountingModel())
+        monkeypatch.setattr(emb_rag, "_PERSIST_EMB_CACHE", True)
+        make_pdf(tmp_path / "murder.pdf", "Murder and its punishment.")
+        make_pdf(tmp_path / "theft.pdf", "Theft of property.")
+
+        emb_rag.index_pdfs(str(tmp_path))
+        encoded = np.array(emb_rag._EMB_MATRIX)
+        emb_rag.clear_index()  # force a rebuild; otherwise the unchanged directory is skipped
+        emb_rag.index_pdfs(str(tmp_path))
+        assert calls == [2]
+
+        # the cache holds int8 rows plus scales, and dequantizes close to the original
+        (cache_file,) = (tmp_path / "vector_store").glob("emb_*.npz")
+        with np.load(cache_file) as data:
+            assert data["q"].dtype == np.int8
+        np.testing.assert_allclose(emb_rag._EMB_MATRIX, encoded, atol=1 / 127)
+
+        make_pdf(tmp_path / "fraud.pdf", "Cheating and fraud.")
+        emb_rag.index_pdfs(str(tmp_path))
+        assert calls == [2, 3]
+        # the rebuilt matrix replaces the stale one instead of piling up beside it
+        assert list((tmp_path / "vector_store").glob("emb_*.npz")) == [cache_file]
+        assert "murder.pdf" in emb_rag.search_pdfs("murder", top_k=1)
+
+    def test_cached_matrix_scores_match_fresh_encoding(self, emb_rag, tmp_path, monkeypatch):
+        """Rows loaded from the int8 cache should be unit length and score like freshly encoded ones."""
+        class DenseModel(FakeEmbeddingModel):
+            # dense components, which int8 rounding cannot represent exactly
+            def encode(self, texts, **kwargs):
+                vecs = super().encode(texts, **kwargs)
+                noise = np.random.default_rng(0).uniform(0.05, 0.3, vecs.shape[1])
+                return (vecs + noise).astype(np.float32)
+
+        monkeypatch.setattr(emb_rag, "load_embedding_model", lambda: DenseModel())
+        monkeypatch.setattr(emb_rag, "_PERSIST_EMB_CACHE", True)
+        make_pdf(tmp_path / "murder.pdf", "Murder and its punishment.")
+        make_pdf(tmp_path / "theft.pdf", "Theft of property and murder.")
+        make_pdf(tmp_path / "fraud.pdf", "Cheating and fraud.")
+
+        emb_rag.index_pdfs(str(tmp_path))
+        fresh = emb_rag._emb_hits("murder", top_k=3)
+        emb_rag.clear_index()
+        emb_rag.index_pdfs(str(tmp_path))
+        cached = emb_rag._emb_hits("murder", top_k=3)
+
+        np.testing.assert_allclose(np.linalg.norm(emb_rag._EMB_MATRIX, axis=1), 1.0, atol=1e-5)
+        assert [h["source"] for h in cached] == [h["source"] for h in fresh]
+        np.testing.assert_allclose([h["score"] for h in cached], [h["score"] for h in fresh], atol=2e-3)
+
+    def test_cache_key_ignores_files_removed_since_the_glob(self, emb_rag, tmp_path):
+        """A PDF deleted between listing and stat should not raise."""
+        make_pdf(tmp_path / "murder.pdf", "Murder and its punishment.")
+        files = [str(tmp_path / "murder.pdf")]
+
+        assert emb_rag._emb_cache_key(files + [str(tmp_path / "gone.pdf")]) == emb_rag._emb_cache_key(files)
+
+    def test_index_pdfs_without_persistence_stays_in_memory(self, emb_rag, tmp_path, monkeypatch):
+        """With the cache off, nothing is written and every rebuild re-encodes."""
+        calls = []
+
+        class CountingModel(FakeEmbeddingModel):
+            def encode(self, texts, **kwargs):
+                calls.append(len(texts))
+                return super().encode(texts, **kwargs)
+
+        monkeypatch.setattr(emb_rag, "load_embedding_model", lambda: CountingModel())
+        monkeypatch.setattr(emb_rag, "_PERSIST_EMB_CACHE", False)
+        make_pdf(tmp_path / "murder.pdf", "Murder and its punishment.")
+
+        emb_rag.index_pdfs(str(tmp_path))
+        emb_rag.clear_index()
+        emb_rag.index_pdfs(str(tmp_path))
+
+        assert calls == [1, 1]
+        assert not (tmp_path / "vector_store").exists()
+        assert "murder.pdf" in emb_rag.search_pdfs("murder", top_k=1)
+
+    def test_repeated_query_is_encoded_once(self, emb_rag, tmp_path, monkeypatch):
+        """The same query against the same model should reuse its cached, read-only vector."""
+        calls = []
+
+        class CountingModel(FakeEmbeddingModel):
+            def encode(self, texts, **kwargs):
+                calls.append(list(texts))
+                return super().encode(texts, **kwargs)
+
+        model = CountingModel()
+        monkeypatch.setattr(emb_rag, "load_embedding_model", lambda: model)
+        make_pdf(tmp_path / "murder.pdf", "Murder and its punishment.")
+        emb_rag.index_pdfs(str(tmp_path))
+
+        first = emb_rag.search_pdfs("murder", top_k=1)
+        assert emb_rag.search_pdfs("murder", top_k=1) == first
+        assert calls.count(["murder"]) == 1
+        assert not emb_rag._encode_query(model, "murder").flags.writeable
+
+    def test_clear_index_drops_embeddings(self, emb_rag, tmp_path):
+        """clear_index should also discard the embedding matrix."""
+        make_pdf(tmp_path / "murder.pdf", "Murder and its punishment.")
+        emb_rag.index_pdfs(str(tmp_path))
+
+        emb_rag.clear_index()
+
+        assert emb_rag._emb_search("murder") is None
+
 
 # ============================================================================
 # Test Class: Edge Cases
@@ -253,49 +581,49 @@ class TestIndexManagement:
 class TestEdgeCases:
     """Tests for edge cases and error handling."""
 
-    def test_handles_special_characters_in_query(self, tmp_path):
-        """search_pdfs should handle special characters in query."""
-        make_pdf(tmp_path / "doc.pdf", "Section 302-A of the IPC.")
-        
-        rag = get_fresh_rag_module()
-        rag.index_pdfs(str(tmp_path))
-        
-        # Should not crash with special characters
-        result = rag.search_pdfs("302-A")
-        # May or may not find results, but shouldn't crash
-        assert result is None or isinstance(result, str)
-
-    def test_handles_unicode_in_query(self, tmp_path):
+    def test_handles_unicode_in_query(self, indexed_rag):
         """search_pdfs should handle unicode characters."""
-        make_pdf(tmp_path / "doc.pdf", "Legal document content.")
-        
-        rag = get_fresh_rag_module()
-        rag.index_pdfs(str(tmp_path))
-        
+        rag = indexed_rag
         # Should not crash with unicode
         result = rag.search_pdfs("भारतीय दंड संहिता")
         assert result is None or isinstance(result, str)
 
-    def test_handles_very_long_query(self, tmp_path):
-        """search_pdfs should handle very long queries."""
-        make_pdf(tmp_path / "doc.pdf", "Brief content.")
-        
-        rag = get_fresh_rag_module()
-        rag.index_pdfs(str(tmp_path))
-        
+    def test_handles_very_long_query(self, indexed_rag):
+        """search_pdfs should handle very long queries in a single normalizing pass."""
+        rag = indexed_rag
         long_query = "legal " * 1000
         result = rag.search_pdfs(long_query)
         assert result is None or isinstance(result, str)
 
-    def test_search_without_prior_indexing(self, tmp_path):
+        # ~100k characters with a matching word; generous bound, guards against per-page re-normalizing
+        long_query = "Legal MURDER " * 8000
+        t0 = time.perf_counter()
+        result = rag.search_pdfs(long_query)
+        assert time.perf_counter() - t0 < 0.5
+        assert "murder.pdf" in result
+
+    def test_repeated_query_words_keep_their_weight(self, rag_module, tmp_path):
+        """Repeating a word should still outweigh a single mention of another."""
+        make_pdf(tmp_path / "bail.pdf", "Bail bail conditions.")
+        make_pdf(tmp_path / "fine.pdf", "Fine fine fine amounts.")
+
+        rag = rag_module
+        rag.index_pdfs(str(tmp_path))
+
+        result = rag.search_pdfs("bail bail bail bail fine", top_k=2)
+
+        assert result.index("bail.pdf") < result.index("fine.pdf")
+        assert rag.search_pdfs("unrelated words only") is None
+
+    def test_search_without_prior_indexing(self, rag_module, tmp_path):
         """search_pdfs should handle being called without prior indexing."""
-        rag = get_fresh_rag_module()
+        rag = rag_module
         
         # Should not crash, may return None
         result = rag.search_pdfs("anything")
         assert result is None or isinstance(result, str)
 
-    def test_index_pdfs_handles_corrupted_pdf(self, tmp_path):
+    def test_index_pdfs_handles_corrupted_pdf(self, rag_module, tmp_path):
         """index_pdfs should gracefully handle corrupted PDF files."""
         # Create a fake "PDF" with invalid content
         corrupted = tmp_path / "corrupted.pdf"
@@ -304,7 +632,7 @@ class TestEdgeCases:
         # Also create a valid PDF
         make_pdf(tmp_path / "valid.pdf", "Valid content here.")
         
-        rag = get_fresh_rag_module()
+        rag = rag_module
         # Should not crash, should still index the valid PDF
         result = rag.index_pdfs(str(tmp_path))
         
@@ -318,11 +646,11 @@ class TestEdgeCases:
 class TestRAGIntegration:
     """Integration tests for the RAG workflow."""
 
-    def test_full_workflow_index_search_clear(self, tmp_path):
-        """Test complete workflow: index -> search -> clear -> search again."""
+    def test_full_lifecycle(self, rag_module, tmp_path):
+        """Index -> search -> add a file and reindex -> search -> clear -> search again."""
         make_pdf(tmp_path / "law.pdf", "IPC Section 302 prescribes punishment for murder.")
         
-        rag = get_fresh_rag_module()
+        rag = rag_module
         
         # Index
         assert rag.index_pdfs(str(tmp_path)) is True
@@ -332,27 +660,18 @@ class TestRAGIntegration:
         assert result is not None
         assert "law.pdf" in result
         
-        # Clear index
-        rag.clear_index()
-        
-        # Search should return None after clearing
-        result = rag.search_pdfs("murder")
-        assert result is None
-
-    def test_reindexing_picks_up_new_files(self, tmp_path):
-        """Reindexing should pick up newly added PDF files."""
-        make_pdf(tmp_path / "original.pdf", "Original document content.")
-        
-        rag = get_fresh_rag_module()
-        rag.index_pdfs(str(tmp_path))
-        
-        # Add new PDF
+        # Add new PDF and reindex
         make_pdf(tmp_path / "newfile.pdf", "New document about cybercrime.")
-        
-        # Reindex
         rag.index_pdfs(str(tmp_path))
         
         # Should find new content
         result = rag.search_pdfs("cybercrime")
         assert result is not None
         assert "newfile.pdf" in result
+        
+        # Clear index
+        rag.clear_index()
+        
+        # Search should return None after clearing
+        assert rag.search_pdfs("murder") is None
+        assert rag.search_pdfs("cybercrime") is None